@@ -103,6 +103,13 @@ load_dotenv()
 
 search_results_cache = TTLCache(maxsize=100, ttl=3600)
 
+# Shared session for outbound API calls so repeat requests to the same provider reuse
+# pooled keep-alive connections instead of paying a TCP+TLS handshake each time
+http_session = requests.Session()
+_http_adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20)
+http_session.mount("https://", _http_adapter)
+http_session.mount("http://", _http_adapter)
+
 # Global Supabase client instance
 # This line must be at module level, outside any function or class
 _supabase_client_instance: Optional[SupabaseClient] = None
@@ -818,7 +825,7 @@ def search_with_tavily(search_query: str, user_id: Optional[str] = None) -> List
     try:
         # Log which key is being used (user-specific or fallback from env, get_api_key handles that detail)
         logger.info(f"Tavily Search: Performing API search for query: '{search_query}', UserID: {user_id or 'N/A'}.")
-        response = requests.post(
+        response = http_session.post(
             "https://api.tavily.com/search",
             headers={"Content-Type": "application/json", "Accept": "application/json"},
             json={
@@ -964,7 +971,7 @@ def fetch_from_mediastack_direct(query: str, user_id: Optional[str] = None) -> L
     try:
         logger.info(f"MediaStack Direct: Performing API search for query: '{query}', UserID: {user_id or 'N/A'}")
         # This is a blocking call. Consider run_in_threadpool if called from async graph node.
-        response = requests.get(endpoint, params=params, timeout=10) # Added timeout
+        response = http_session.get(endpoint, params=params, timeout=10) # Added timeout
         response.raise_for_status() # Raises HTTPError for bad responses (4XX or 5XX)
         data = response.json()
 
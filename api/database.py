@@ -1,7 +1,16 @@
 import os
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
-from supabase import create_client, Client
+import httpx
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+from postgrest.utils import SyncClient
+from supabase import Client
+
+try:
+    import h2  # noqa: F401 -- lets httpx multiplex PostgREST requests over HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -11,6 +20,30 @@ SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") # Use service role key for
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("Supabase URL and Key must be set in environment variables for the backend.")
 
+class _PooledSyncPostgrestClient(SyncPostgrestClient):
+    """SyncPostgrestClient with an explicit keep-alive pool and one connect retry."""
+
+    def create_session(self, base_url, headers, timeout) -> SyncClient:
+        # postgrest's SyncClient, not a bare httpx.Client: SyncPostgrestClient's
+        # aclose() and __exit__ call session.aclose(), which only it defines
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=httpx.HTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30),
+                retries=1,
+            ),
+        )
+
+class _PooledClient(Client):
+    """Supabase client whose table queries go through _PooledSyncPostgrestClient."""
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=5) -> SyncPostgrestClient:
+        return _PooledSyncPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
 _supabase_client: Optional[Client] = None
 
 def get_supabase_client() -> Client:
@@ -18,10 +51,49 @@ def get_supabase_client() -> Client:
     global _supabase_client
     if _supabase_client is None:
         print(f"Initializing Supabase client for URL: {SUPABASE_URL[:20]}...") # Log only part of the URL
-        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        _supabase_client = _PooledClient(SUPABASE_URL, SUPABASE_KEY)
         print("Supabase client initialized.")
     return _supabase_client
 
+class _PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose httpx session keeps a bounded keep-alive pool."""
+
+    def create_session(self, base_url, headers, timeout) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+
+_async_postgrest_client: Optional[AsyncPostgrestClient] = None
+
+def get_async_postgrest_client() -> AsyncPostgrestClient:
+    """
+    Initializes and returns a shared async PostgREST client for table queries from
+    request handlers. Its builders mirror client.table(...) but execute() is awaitable.
+    """
+    global _async_postgrest_client
+    if _async_postgrest_client is None:
+        _async_postgrest_client = _PooledAsyncPostgrestClient(
+            f"{SUPABASE_URL}/rest/v1",
+            headers={
+                "apiKey": SUPABASE_KEY,
+                "Authorization": f"Bearer {SUPABASE_KEY}",
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+        )
+    return _async_postgrest_client
+
+async def close_async_postgrest_client() -> None:
+    """Closes the shared async PostgREST client's connections, if it was created."""
+    global _async_postgrest_client
+    if _async_postgrest_client is not None:
+        await _async_postgrest_client.aclose()
+        _async_postgrest_client = None
+
 # Constants for table names
 DOCUMENTS_TABLE = "documents"
 
@@ -1,49 +1,168 @@
 from fastapi import FastAPI, HTTPException, Request, File, UploadFile, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 import uvicorn
 import os
+import sys
 import io
 import uuid
 import base64
-from datetime import datetime
+import codecs
+import copy
+import csv
+import time
+import hashlib
 import traceback
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, BinaryIO
 import asyncio
-import aiohttp
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import logging
+from cachetools import TTLCache
 import pandas as pd
 import numpy as np
-from supabase import create_client, Client
+from supabase import Client
+from postgrest import AsyncPostgrestClient, APIError
+from postgrest.types import CountMethod
 from pathlib import Path
 import json
+import orjson
 from . import database # For MongoDB operations
 from . import text_processor # For text extraction and analysis
 
+try:
+    import pyarrow  # noqa: F401 -- enables pandas' multithreaded Arrow CSV reader
+    CSV_READ_ENGINE = "pyarrow"
+except ImportError:
+    CSV_READ_ENGINE = "c"
+
+try:
+    import pypdfium2 as pdfium  # installed alongside pdfplumber
+except ImportError:
+    pdfium = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Market Intelligence Agent API", version="1.0.0")
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") for the most recently formatted second
+_iso_cache = (0, "")
+
+def iso_now() -> str:
+    """
+    Returns the current UTC time as an ISO 8601 string with millisecond precision.
+    The seconds part is formatted at most once per second and reused, so endpoints
+    stamping several timestamps per request only pay for a clock read.
+    """
+    global _iso_cache
+    now_ms = time.time_ns() // 1_000_000
+    second, prefix = _iso_cache
+    if now_ms // 1000 != second:
+        second = now_ms // 1000
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _iso_cache = (second, prefix)
+    return f"{prefix}.{now_ms % 1000:03d}Z"
+
+app = FastAPI(
+    title="Market Intelligence Agent API",
+    version="1.0.0",
+    # orjson is several times faster than json.dumps on the large nested summaries
+    # returned for uploads, and writes NaN in sample rows as null instead of failing
+    default_response_class=ORJSONResponse
+)
+
+MAX_FILE_SIZE_MB = 50
+MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+# Multipart framing and form fields ride on top of the file itself
+MAX_REQUEST_BODY_BYTES = MAX_FILE_SIZE_BYTES + 1024 * 1024
+
+class MaxBodySizeMiddleware:
+    """
+    Rejects request bodies over max_body_size with 413 before they are buffered.
+    A declared Content-Length is checked up front; chunked bodies are counted as
+    they are received and cut off once they cross the limit.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_body_size:
+                    response = ORJSONResponse(
+                        status_code=413,
+                        content={"detail": f"Request body exceeds limit of {self.max_body_size} bytes."}
+                    )
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Handled by FastAPI's exception middleware like any other HTTPException
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Request body exceeds limit of {self.max_body_size} bytes."
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+# Registered before CORS and GZip so it runs inside them and its 413s carry the CORS
+# headers the front-end needs to read them
+app.add_middleware(MaxBodySizeMiddleware, max_body_size=MAX_REQUEST_BODY_BYTES)
+
+# Compress JSON bodies over 500 bytes; tiny payloads like /api/agent/status go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
+# Add CORS middleware. Credentialed requests need explicit origins anyway, and a fixed
+# list lets the middleware match each Origin with a set lookup instead of reflecting it.
+# FRONTEND_ORIGINS is a comma-separated list of the front-end URLs allowed to call the API.
+FRONTEND_ORIGINS = frozenset(
+    origin.strip()
+    for origin in os.getenv("FRONTEND_ORIGINS", "http://localhost:3000").split(",")
+    if origin.strip()
+)
+CORS_ALLOW_METHODS = ("GET", "POST", "PUT", "DELETE", "OPTIONS")
+CORS_ALLOW_HEADERS = ("Authorization", "Content-Type")
 
-# Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=FRONTEND_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=CORS_ALLOW_METHODS,
+    allow_headers=CORS_ALLOW_HEADERS,
 )
 
 # Initialize Supabase client
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 supabase: Optional[Client] = None
+# Table queries from request handlers go through the async PostgREST client;
+# the sync supabase client is kept for auth
+postgrest_db: Optional[AsyncPostgrestClient] = None
 
 if supabase_url and supabase_service_key:
     try:
-        supabase = create_client(supabase_url, supabase_service_key)
+        # Reuse the database module's client so both share one PostgREST connection pool
+        supabase = database.get_supabase_client()
+        postgrest_db = database.get_async_postgrest_client()
         logger.info("Supabase client initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize Supabase client: {e}")
@@ -86,70 +205,240 @@ class FileAnalysisRequest(BaseModel):
     analysis_type: str = "comprehensive"
     additional_context: Optional[str] = None
 
-# Authentication dependency
-def get_current_user(request: Request):
+# Verified users keyed by a digest of their bearer token, so repeat requests with the
+# same token skip the Supabase round-trip. Entries are also dropped shortly before the
+# token's own exp claim. Only touched from the event loop, so it needs no lock.
+_auth_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+AUTH_CACHE_EXPIRY_MARGIN_SECONDS = 30
+
+def _token_expiry(token: str) -> float:
+    """Reads the exp claim from a JWT payload without verifying it; returns 0 if absent."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload)).get("exp", 0))
+    except Exception:
+        return 0.0
+
+# Authentication dependency. Async so cache hits resolve on the event loop without
+# taking a threadpool slot; only the Supabase verification itself is offloaded.
+async def get_current_user(request: Request):
     # Extract JWT token from Authorization header
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     
     token = auth_header.split(" ")[1]
+
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _auth_cache.get(cache_key)
+    if cached is not None:
+        cached_user, expires_at = cached
+        if expires_at - AUTH_CACHE_EXPIRY_MARGIN_SECONDS > time.time():
+            return cached_user
+        _auth_cache.pop(cache_key, None)
     
     if not supabase:
         raise HTTPException(status_code=500, detail="Supabase client not initialized")
     
     try:
         # Verify JWT token with Supabase
-        user = supabase.auth.get_user(token)
-        return user.user
+        user = await run_in_threadpool(supabase.auth.get_user, token)
     except Exception as e:
         logger.error(f"Authentication error: {e}")
         raise HTTPException(status_code=401, detail="Invalid authentication token")
 
+    if user and user.user:
+        # Only cache after Supabase has accepted the token, so the exp claim can be trusted
+        _auth_cache[cache_key] = (user.user, _token_expiry(token))
+    return user.user
+
 # File processing utilities
+# CSVs above this size are summarized in chunks of CSV_CHUNK_ROWS rows instead of as one frame
+CSV_CHUNKED_THRESHOLD_BYTES = 20 * 1024 * 1024
+CSV_CHUNK_ROWS = 200_000
+# Sample rows only carry the first this-many columns so previews of wide tables stay small
+SAMPLE_MAX_COLUMNS = 50
+# Text files are scanned in blocks of this size; the preview needs at most 4 bytes per character
+TEXT_SCAN_BLOCK_BYTES = 1024 * 1024
+TEXT_SAMPLE_BYTES = 500 * 4
+# Lookup table for the bytes str.split() treats as whitespace in ASCII text
+_ASCII_WHITESPACE = np.zeros(256, dtype=bool)
+_ASCII_WHITESPACE[[0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x1C, 0x1D, 0x1E, 0x1F, 0x20]] = True
+
 class FileProcessor:
+    """
+    Parsers for uploaded files. Each method takes a binary file handle (e.g. the
+    SpooledTemporaryFile behind UploadFile.file) rather than the full payload as bytes,
+    so callers never have to read the upload into memory before parsing.
+    """
+
+    @staticmethod
+    def _read_csv(file: BinaryIO) -> pd.DataFrame:
+        """Read a CSV with the Arrow reader when available, falling back to pandas' C parser"""
+        if CSV_READ_ENGINE == "pyarrow":
+            try:
+                return pd.read_csv(file, engine="pyarrow")
+            except Exception as e:
+                logger.warning(f"Arrow CSV reader failed, retrying with the C parser: {e}")
+                file.seek(0)
+        return pd.read_csv(file)
+
+    @staticmethod
+    def _null_count(column: pd.Series) -> int:
+        """Count missing values in one column without materializing a boolean frame"""
+        dtype = column.dtype
+        if isinstance(dtype, np.dtype):
+            if dtype.kind in "iub":
+                # Plain NumPy integer and bool columns cannot hold NaN
+                return 0
+            if dtype.kind in "fc":
+                return int(np.count_nonzero(np.isnan(column.to_numpy())))
+        return int(column.isna().to_numpy().sum())
+
+    @staticmethod
+    def _summarize(df: pd.DataFrame, sample_rows: int) -> Dict[str, Any]:
+        """Build the per-table summary shared by the CSV and Excel processors"""
+        # Dtypes and null counts are collected in one pass over the columns
+        data_types = {}
+        null_counts = {}
+        for name, column in df.items():
+            data_types[name] = str(column.dtype)
+            null_counts[name] = FileProcessor._null_count(column)
+
+        # Only numeric columns go through describe(); object columns would otherwise
+        # pay for unique/top/freq statistics nobody reads
+        numeric = df.select_dtypes(include="number")
+        if numeric.columns.empty:
+            summary = {}
+        else:
+            described = numeric.describe()
+            # Columnar layout names each statistic and column once instead of nesting a
+            # {stat: value} dict per column: {"stats": [...], "columns": [...],
+            # "values": [[one value per column] for each stat]}
+            summary = {
+                "stats": described.index.tolist(),
+                "columns": described.columns.tolist(),
+                "values": described.to_numpy().tolist()
+            }
+
+        return {
+            "rows": len(df),
+            "columns": len(df.columns),
+            "column_names": df.columns.tolist(),
+            "data_types": data_types,
+            "summary": summary,
+            # Split layout names each column once instead of repeating it in every row dict:
+            # {"columns": [...], "data": [[row values], ...]}
+            "sample_data": df.iloc[:sample_rows, :SAMPLE_MAX_COLUMNS].to_dict(orient="split", index=False),
+            "null_counts": null_counts,
+            "total_nulls": sum(null_counts.values())
+        }
+
     @staticmethod
-    def process_csv(file_content: bytes) -> Dict[str, Any]:
+    def _process_csv_chunked(file: BinaryIO) -> Dict[str, Any]:
+        """
+        Summarizes a large CSV chunk by chunk so only one chunk is in memory at a time.
+        Numeric statistics are merged across chunks (count/mean/std/min/max; percentiles
+        need the full column and are omitted). Column names, dtypes and the sample rows
+        come from the first chunk; as in process_csv, only the sample is capped at
+        SAMPLE_MAX_COLUMNS columns.
+        """
+        rows = 0
+        null_counts: Dict[str, int] = {}
+        # column -> [count, mean, sum of squared deviations, min, max]
+        stats: Dict[str, List[float]] = {}
+        # Metadata from the first chunk covers every column; only the sample is capped
+        column_names: Optional[List[str]] = None
+        data_types: Dict[str, str] = {}
+        sample = None
+
+        for chunk in pd.read_csv(file, chunksize=CSV_CHUNK_ROWS):
+            if column_names is None:
+                column_names = chunk.columns.tolist()
+                data_types = chunk.dtypes.astype(str).to_dict()
+                sample = chunk.iloc[:10, :SAMPLE_MAX_COLUMNS]
+            rows += len(chunk)
+
+            for name, column in chunk.items():
+                null_counts[name] = null_counts.get(name, 0) + FileProcessor._null_count(column)
+
+            for name, column in chunk.select_dtypes(include="number").items():
+                n_b = int(column.count())
+                if not n_b:
+                    continue
+                mean_b = float(column.mean())
+                m2_b = float(column.var(ddof=0)) * n_b
+                low, high = float(column.min()), float(column.max())
+                acc = stats.get(name)
+                if acc is None:
+                    stats[name] = [n_b, mean_b, m2_b, low, high]
+                    continue
+                # Chan et al. parallel merge of (count, mean, M2)
+                n_a, mean_a, m2_a = acc[0], acc[1], acc[2]
+                n = n_a + n_b
+                delta = mean_b - mean_a
+                acc[0] = n
+                acc[1] = mean_a + delta * n_b / n
+                acc[2] = m2_a + m2_b + delta * delta * n_a * n_b / n
+                acc[3] = min(acc[3], low)
+                acc[4] = max(acc[4], high)
+
+        # Same columnar layout as _summarize, minus the percentiles
+        per_column = [
+            (float(n), mean, (m2 / (n - 1)) ** 0.5 if n > 1 else None, low, high)
+            for n, mean, m2, low, high in stats.values()
+        ]
+        summary = {
+            "stats": ["count", "mean", "std", "min", "max"],
+            "columns": list(stats),
+            "values": [list(values) for values in zip(*per_column)]
+        } if stats else {}
+
+        return {
+            "type": "csv",
+            "rows": rows,
+            "columns": len(column_names),
+            "column_names": column_names,
+            "data_types": data_types,
+            "summary": summary,
+            "sample_data": sample.to_dict(orient="split", index=False),
+            "null_counts": null_counts,
+            "total_nulls": sum(null_counts.values())
+        }
+
+    @staticmethod
+    def process_csv(file: BinaryIO) -> Dict[str, Any]:
         """Process CSV file and return structured data"""
         try:
-            df = pd.read_csv(io.BytesIO(file_content))
-            return {
-                "type": "csv",
-                "rows": len(df),
-                "columns": len(df.columns),
-                "column_names": df.columns.tolist(),
-                "data_types": df.dtypes.astype(str).to_dict(),
-                "summary": df.describe().to_dict(),
-                "sample_data": df.head(10).to_dict(orient="records"),
-                "null_counts": df.isnull().sum().to_dict()
-            }
+            file_size = file.seek(0, os.SEEK_END)
+            file.seek(0)
+            if file_size > CSV_CHUNKED_THRESHOLD_BYTES:
+                return FileProcessor._process_csv_chunked(file)
+
+            df = FileProcessor._read_csv(file)
+            return {"type": "csv", **FileProcessor._summarize(df, sample_rows=10)}
         except Exception as e:
             logger.error(f"CSV processing error: {e}")
             raise HTTPException(status_code=400, detail=f"CSV processing failed: {str(e)}")
 
     @staticmethod
-    def process_excel(file_content: bytes) -> Dict[str, Any]:
+    def process_excel(file: BinaryIO) -> Dict[str, Any]:
         """Process Excel file and return structured data"""
         try:
-            # Read all sheets
-            xl_file = pd.ExcelFile(io.BytesIO(file_content))
-            sheets_data = {}
-            
-            for sheet_name in xl_file.sheet_names:
-                df = pd.read_excel(io.BytesIO(file_content), sheet_name=sheet_name)
-                sheets_data[sheet_name] = {
-                    "rows": len(df),
-                    "columns": len(df.columns),
-                    "column_names": df.columns.tolist(),
-                    "data_types": df.dtypes.astype(str).to_dict(),
-                    "summary": df.describe().to_dict(),
-                    "sample_data": df.head(5).to_dict(orient="records"),
-                    "null_counts": df.isnull().sum().to_dict()
-                }
+            # Open the workbook once and parse each sheet from the same handle,
+            # instead of re-reading the whole file for every sheet
+            with pd.ExcelFile(file, engine="openpyxl") as xl_file:
+                sheet_names = list(xl_file.sheet_names)
+                sheets_data = {}
+
+                for sheet_name in sheet_names:
+                    df = xl_file.parse(sheet_name)
+                    sheets_data[sheet_name] = FileProcessor._summarize(df, sample_rows=5)
             
             return {
                 "type": "excel",
-                "sheets": list(xl_file.sheet_names),
+                "sheets": sheet_names,
                 "sheets_data": sheets_data
             }
         except Exception as e:
@@ -157,19 +446,55 @@ class FileProcessor:
             raise HTTPException(status_code=400, detail=f"Excel processing failed: {str(e)}")
 
     @staticmethod
-    def process_text(file_content: bytes) -> Dict[str, Any]:
-        """Process text file and return analysis"""
+    def process_text(file: BinaryIO) -> Dict[str, Any]:
+        """
+        Process text file and return analysis. The file is read in fixed-size blocks, so
+        no decoded copy of the whole file or line/word lists are ever built. ASCII blocks
+        are counted on their bytes; any other block is decoded and counted with str
+        methods, so non-ASCII whitespace and invalid UTF-8 give the same counts as
+        decoding the whole file with errors='ignore'.
+        """
         try:
-            text = file_content.decode('utf-8', errors='ignore')
-            lines = text.split('\n')
-            words = text.split()
-            
+            character_count = 0
+            newline_count = 0
+            word_count = 0
+            prev_is_space = True
+            head = b""
+            # Holds back a multi-byte character split across two blocks
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+            while block := file.read(TEXT_SCAN_BLOCK_BYTES):
+                if len(head) < TEXT_SAMPLE_BYTES:
+                    head += block[:TEXT_SAMPLE_BYTES - len(head)]
+                newline_count += block.count(b"\n")
+                if block.isascii() and not decoder.getstate()[0]:
+                    character_count += len(block)
+                    # A word starts wherever a non-whitespace byte follows whitespace
+                    is_space = _ASCII_WHITESPACE[np.frombuffer(block, dtype=np.uint8)]
+                    starts = ~is_space
+                    starts[1:] &= is_space[:-1]
+                    starts[0] &= prev_is_space
+                    word_count += int(np.count_nonzero(starts))
+                    prev_is_space = bool(is_space[-1])
+                    continue
+
+                text = decoder.decode(block)
+                if not text:
+                    continue
+                character_count += len(text)
+                word_count += len(text.split())
+                # A word running on from the previous block was already counted there
+                if not prev_is_space and not text[0].isspace():
+                    word_count -= 1
+                prev_is_space = text[-1].isspace()
+
+            sample = head.decode('utf-8', errors='ignore')[:500]
             return {
                 "type": "text",
-                "character_count": len(text),
-                "word_count": len(words),
-                "line_count": len(lines),
-                "sample_content": text[:500] + "..." if len(text) > 500 else text,
+                "character_count": character_count,
+                "word_count": word_count,
+                "line_count": newline_count + 1,
+                "sample_content": sample + "..." if character_count > 500 else sample,
                 "encoding": "utf-8"
             }
         except Exception as e:
@@ -177,31 +502,91 @@ class FileProcessor:
             raise HTTPException(status_code=400, detail=f"Text processing failed: {str(e)}")
 
     @staticmethod
-    def process_pdf(file_content: bytes) -> Dict[str, Any]:
-        """Process PDF file (basic info for now)"""
+    def process_pdf(file: BinaryIO) -> Dict[str, Any]:
+        """
+        Extract text from a PDF page by page, closing each page before opening the next
+        so memory stays flat regardless of page count. Only counts and a short sample of
+        the text are returned.
+        """
         try:
-            # For now, return basic file info
-            # In production, you'd use PyPDF2 or similar
+            size_bytes = file.seek(0, os.SEEK_END)
+            if pdfium is None:
+                return {
+                    "type": "pdf",
+                    "size_bytes": size_bytes,
+                    "note": "PDF text extraction requires pypdfium2. File stored for future processing.",
+                    "processing_status": "pending"
+                }
+
+            file.seek(0)
+            pdf = pdfium.PdfDocument(file)
+            try:
+                page_count = len(pdf)
+                character_count = 0
+                word_count = 0
+                sample_parts: List[str] = []
+                sample_len = 0
+                for index in range(page_count):
+                    page = pdf[index]
+                    textpage = page.get_textpage()
+                    try:
+                        # PDFium separates lines with CRLF; keep LF like the other extractors
+                        text = textpage.get_text_range().replace("\r\n", "\n")
+                    finally:
+                        textpage.close()
+                        page.close()
+                    character_count += len(text)
+                    word_count += len(text.split())
+                    if sample_len <= 500:
+                        sample_parts.append(text)
+                        sample_len += len(text)
+            finally:
+                pdf.close()
+
+            sample = "\n".join(sample_parts)
             return {
                 "type": "pdf",
-                "size_bytes": len(file_content),
-                "note": "PDF text extraction requires additional libraries. File stored for future processing.",
-                "processing_status": "pending"
+                "size_bytes": size_bytes,
+                "page_count": page_count,
+                "character_count": character_count,
+                "word_count": word_count,
+                "sample_content": sample[:500] + "..." if len(sample) > 500 else sample,
+                "processing_status": "processed"
             }
         except Exception as e:
             logger.error(f"PDF processing error: {e}")
             raise HTTPException(status_code=400, detail=f"PDF processing failed: {str(e)}")
 
+# Fixed parts of the simulated insights payload
+_INSIGHT_RECOMMENDATIONS = (
+    "Focus on digital-first approach to capture emerging market segments",
+    "Invest in customer experience improvements",
+    "Monitor competitive pricing strategies closely",
+    "Diversify market presence to reduce concentration risk"
+)
+_INSIGHT_DATA_SOURCES = ("market_research", "competitive_analysis", "financial_data")
+
 # Market Intelligence AI Agent
 class MarketIntelligenceAgent:
     def __init__(self):
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.news_api_key = os.getenv("NEWS_API_KEY")
         self.tavily_api_key = os.getenv("TAVILY_API_KEY")
+        # Insights keyed by (query, market_domain); generated_at is stamped per call
+        self._insights_cache: TTLCache = TTLCache(maxsize=1024, ttl=600)
         
-    async def generate_insights(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Generate AI-powered market intelligence insights"""
+    async def generate_insights(self, query: str, context: Dict[str, Any] = None, now_iso: Optional[str] = None) -> Dict[str, Any]:
+        """Generate AI-powered market intelligence insights. Callers may pass the request's timestamp as now_iso."""
         try:
+            context = context or {}
+            cache_key = hashlib.blake2b(
+                f"{query}|{context.get('market_domain')}".encode(), digest_size=16
+            ).digest()
+            cached = self._insights_cache.get(cache_key)
+            if cached is not None:
+                # Hand out a fresh copy so callers can't mutate the cached entry
+                return {**copy.deepcopy(cached), "generated_at": now_iso or iso_now()}
+
             # Simulated AI analysis for now
             # In production, integrate with actual LLM APIs
             insights = {
@@ -212,28 +597,24 @@ class MarketIntelligenceAgent:
                     f"Growth opportunities identified in {context.get('market_domain', 'target market')} segment",
                     f"Risk factors include market volatility and regulatory changes"
                 ],
-                "recommendations": [
-                    "Focus on digital-first approach to capture emerging market segments",
-                    "Invest in customer experience improvements",
-                    "Monitor competitive pricing strategies closely",
-                    "Diversify market presence to reduce concentration risk"
-                ],
+                "recommendations": list(_INSIGHT_RECOMMENDATIONS),
                 "confidence_score": 0.87,
-                "data_sources": ["market_research", "competitive_analysis", "financial_data"],
-                "generated_at": datetime.now().isoformat()
+                "data_sources": list(_INSIGHT_DATA_SOURCES),
+                "generated_at": now_iso or iso_now()
             }
+            self._insights_cache[cache_key] = copy.deepcopy(insights)
             
             return insights
         except Exception as e:
             logger.error(f"AI insights generation error: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to generate insights: {str(e)}")
 
-    async def process_file_with_ai(self, file_data: Dict[str, Any], query: str = None) -> Dict[str, Any]:
-        """Process uploaded file data with AI analysis"""
+    async def process_file_with_ai(self, file_data: Dict[str, Any], query: str = None, now_iso: Optional[str] = None) -> Dict[str, Any]:
+        """Process uploaded file data with AI analysis. Callers may pass the request's timestamp as now_iso."""
         try:
             analysis = {
                 "file_type": file_data.get("type"),
-                "processing_timestamp": datetime.now().isoformat(),
+                "processing_timestamp": now_iso or iso_now(),
                 "ai_insights": [],
                 "recommendations": [],
                 "visualizations": []
@@ -241,9 +622,13 @@ class MarketIntelligenceAgent:
             
             if file_data.get("type") == "csv":
                 # Analyze CSV data
+                # Summaries stored before total_nulls existed only carry the per-column counts
+                total_nulls = file_data.get("total_nulls")
+                if total_nulls is None:
+                    total_nulls = sum(file_data.get("null_counts", {}).values())
                 analysis["ai_insights"] = [
                     f"Dataset contains {file_data.get('rows', 0)} records across {file_data.get('columns', 0)} dimensions",
-                    "Data quality assessment: " + ("High" if file_data.get('null_counts', {}) else "Moderate"),
+                    "Data quality assessment: " + ("High" if total_nulls == 0 else "Moderate"),
                     "Potential for trend analysis and predictive modeling identified"
                 ]
                 
@@ -277,6 +662,10 @@ class MarketIntelligenceAgent:
 # Initialize AI agent
 ai_agent = MarketIntelligenceAgent()
 
+@app.on_event("shutdown")
+async def close_postgrest_client():
+    await database.close_async_postgrest_client()
+
 # MongoDB startup/shutdown events are no longer needed with Supabase client's lazy initialization.
 # @app.on_event("startup")
 # async def startup_db_client():
@@ -290,22 +679,26 @@ ai_agent = MarketIntelligenceAgent()
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception: {str(exc)}\n{traceback.format_exc()}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
             "details": str(exc),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now()
         }
     )
 
+# Route handlers are all `async def` and run on the event loop. Anything that blocks
+# (sync Supabase/database helpers, file parsing, disk I/O) must be awaited through
+# run_in_threadpool or an async client such as postgrest_db, never called inline.
+
 @app.get("/")
 async def root():
     return {
         "message": "Market Intelligence Agent API",
         "version": "1.0.0",
         "status": "running",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": iso_now(),
         "features": [
             "market_analysis",
             "file_processing", 
@@ -319,7 +712,7 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": iso_now(),
         "services": {
             "api": "running",
             "database": "connected" if supabase else "not_configured",
@@ -331,12 +724,14 @@ async def health_check():
 @app.post("/api/analyze")
 async def analyze(request: AnalysisRequest, user=Depends(get_current_user)):
     try:
-        logger.info(f"Analysis request: {request.query} for domain: {request.market_domain}")
+        logger.info("Analysis request: %s for domain: %s", request.query, request.market_domain)
+        now_iso = iso_now()
 
         # Generate AI-powered insights
         insights = await ai_agent.generate_insights(
             request.query,
-            {"market_domain": request.market_domain, "question": request.question}
+            {"market_domain": request.market_domain, "question": request.question},
+            now_iso=now_iso
         )
         
         # Store analysis in database
@@ -348,11 +743,11 @@ async def analyze(request: AnalysisRequest, user=Depends(get_current_user)):
                     "market_domain": request.market_domain,
                     "question": request.question,
                     "insights": insights,
-                    "created_at": datetime.now().isoformat()
+                    "created_at": now_iso
                 }
                 
-                result = supabase.table("market_analyses").insert(analysis_record).execute()
-                logger.info(f"Analysis stored with ID: {result.data[0]['id'] if result.data else 'unknown'}")
+                result = await postgrest_db.table("market_analyses").insert(analysis_record).execute()
+                logger.info("Analysis stored with ID: %s", result.data[0]['id'] if result.data else 'unknown')
             except Exception as db_error:
                 logger.warning(f"Failed to store analysis in database: {db_error}")
                 # Continue without failing the request
@@ -364,7 +759,7 @@ async def analyze(request: AnalysisRequest, user=Depends(get_current_user)):
             "analysis": insights.get("insights", []),
             "recommendations": insights.get("recommendations", []),
             "confidence_score": insights.get("confidence_score", 0.87),
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso,
             "metadata": {
                 "processing_time_ms": 1250,
                 "data_sources": insights.get("data_sources", []),
@@ -372,17 +767,26 @@ async def analyze(request: AnalysisRequest, user=Depends(get_current_user)):
             }
         }
 
-        return analysis_result
+        # Returning the response directly skips FastAPI's jsonable_encoder pass over the dict
+        return ORJSONResponse(analysis_result)
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+_DEFAULT_CHAT_SUGGESTIONS = (
+    "Would you like more details about market trends?",
+    "Should I analyze competitor positioning?",
+    "Do you need strategic recommendations?"
+)
+
 @app.post("/api/chat")
 async def chat(request: ChatRequest):
     try:
-        logger.info(f"Chat request with {len(request.messages)} messages")
+        message_count = len(request.messages)
+        logger.info("Chat request with %d messages", message_count)
+        now_iso = iso_now()
 
-        last_message = request.messages[-1] if request.messages else {}
+        last_message = request.messages[-1] if message_count else {}
         user_content = last_message.get("content", "")
         session_id = request.context.get("session_id") if request.context else None
 
@@ -395,130 +799,243 @@ async def chat(request: ChatRequest):
         # Generate AI response using market intelligence agent
         ai_response = await ai_agent.generate_insights(
             user_content,
-            {"type": "chat", "session_id": session_id}
+            {"type": "chat", "session_id": session_id},
+            now_iso=now_iso
         )
 
         response = {
             "response": f"Based on my market intelligence analysis{context_info}, here are insights about '{user_content}': " + 
                        " ".join(ai_response.get("insights", ["I can help you with market analysis and insights."])[:2]),
             "context": {
-                "message_count": len(request.messages),
+                "message_count": message_count,
                 "query_type": "market_intelligence",
                 "confidence": ai_response.get("confidence_score", 0.92),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
                 "session_id": session_id
             },
-            "suggestions": ai_response.get("recommendations", [
-                "Would you like more details about market trends?",
-                "Should I analyze competitor positioning?",
-                "Do you need strategic recommendations?"
-            ])[:3]
+            "suggestions": ai_response.get("recommendations", _DEFAULT_CHAT_SUGGESTIONS)[:3]
         }
 
-        return response
+        return ORJSONResponse(response)
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
 
+# Caps how many documents are parsed at once so a burst of uploads can't saturate
+# every core (and the memory behind them) at the expense of request handling
+PARSE_CONCURRENCY = min(4, os.cpu_count() or 1)
+_parse_semaphore: Optional[asyncio.Semaphore] = None
+
+def get_parse_semaphore() -> asyncio.Semaphore:
+    """Created on first use so it binds to the server's running event loop"""
+    global _parse_semaphore
+    if _parse_semaphore is None:
+        _parse_semaphore = asyncio.Semaphore(PARSE_CONCURRENCY)
+    return _parse_semaphore
+
+# Text extraction (pdfminer, python-docx) is pure-Python and holds the GIL, so it runs
+# in worker processes sized to match the semaphore above rather than in the threadpool
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    Started on first use so importing the app doesn't start workers. Workers come from
+    a forkserver, since forking the server itself would copy its threadpool and HTTP
+    client threads' locks mid-use into the child.
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=PARSE_CONCURRENCY, mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _extraction_pool
+
+def reset_extraction_pool(pool: ProcessPoolExecutor):
+    """Drops a pool whose worker died so the next job starts a fresh one"""
+    global _extraction_pool
+    pool.shutdown(wait=False, cancel_futures=True)
+    if _extraction_pool is pool:
+        _extraction_pool = None
+
+@app.on_event("shutdown")
+def shutdown_extraction_pool():
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+
 async def process_document_pipeline(document_id: str, internal_filename: str, original_filename: str, file_extension: str, saved_file_path: str):
     """
     Background task to process a document: extract text, analyze keywords, and update MongoDB.
     """
-    logger.info(f"Background task started for document_id: {document_id}, file: {original_filename} (path: {saved_file_path})")
+    logger.info("Background task started for document_id: %s, file: %s (path: %s)", document_id, original_filename, saved_file_path)
     try:
         # 1. Update status to processing
-        update_success = database.update_document_by_id(document_id, {"status": "processing"})
+        update_success = await run_in_threadpool(database.update_document_by_id, document_id, {"status": "processing"})
         if not update_success:
             logger.error(f"Failed to update status to 'processing' for document_id: {document_id}. Aborting pipeline.")
             return
 
         # 2. Extract text
         # Note: extract_text_from_file expects file_extension, not mime_type for routing.
-        extracted_data = text_processor.extract_text_from_file(saved_file_path, file_extension)
+        async with get_parse_semaphore():
+            pool = get_extraction_pool()
+            try:
+                extracted_data = await asyncio.get_running_loop().run_in_executor(
+                    pool, text_processor.extract_text_from_file, saved_file_path, file_extension
+                )
+            except BrokenProcessPool:
+                # A worker crashed (PDFium on a malformed file, or the OOM killer); the
+                # pool refuses all further work, so replace it before failing this job
+                reset_extraction_pool(pool)
+                raise
         
         if not extracted_data or extracted_data.get("text") is None: # Check for None explicitly if empty text is valid but count is 0
             logger.error(f"Text extraction failed or returned empty for document_id: {document_id}")
-            database.update_document_by_id(document_id, {"status": "extraction_failed", "error_message": "Failed to extract text or text is empty."})
+            await run_in_threadpool(database.update_document_by_id, document_id, {"status": "extraction_failed", "error_message": "Failed to extract text or text is empty."})
             return
         
         extracted_text = extracted_data["text"]
         word_count = extracted_data["word_count"]
-        
-        update_success = database.update_document_by_id(document_id, {
+        logger.info("Text extracted for document_id: %s, word count: %s", document_id, word_count)
+
+        # 3. Analyze text (keywords)
+        async with get_parse_semaphore():
+            analysis_results = await run_in_threadpool(text_processor.analyze_text_keywords, extracted_text)
+
+        # 4. Store the extracted text and analysis together in one write
+        update_success = await run_in_threadpool(database.update_document_by_id, document_id, {
             "text": extracted_text,
             "word_count": word_count,
             "text_preview": extracted_text[:500], # Ensure preview is based on actual extracted text
-            "status": "text_extracted"
-        })
-        if not update_success:
-            logger.error(f"Failed to update DB after text extraction for document_id: {document_id}.")
-            # Decide if to continue or abort; for now, we'll log and continue to analysis if text was extracted
-        
-        logger.info(f"Text extracted for document_id: {document_id}, word count: {word_count}")
-
-        # 3. Analyze text (keywords)
-        analysis_results = text_processor.analyze_text_keywords(extracted_text)
-        update_success = database.update_document_by_id(document_id, {
             "analysis": analysis_results,
             "status": "analyzed" # Final successful status for this pipeline
         })
         if not update_success:
-             logger.error(f"Failed to update DB after text analysis for document_id: {document_id}.")
-             # Status remains 'text_extracted' or whatever previous state was if this fails
+            logger.error(f"Failed to store extracted text and analysis for document_id: {document_id}.")
+            # Status remains 'processing' if this fails
+            return
 
-        logger.info(f"Successfully processed and analyzed document_id: {document_id}")
+        logger.info("Successfully processed and analyzed document_id: %s", document_id)
 
     except Exception as e:
         logger.error(f"Error in processing pipeline for document_id {document_id}: {e}\n{traceback.format_exc()}")
-        database.update_document_by_id(document_id, {"status": "processing_failed", "error_message": str(e)})
-
-ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt", ".csv", ".xlsx"}
-MAX_FILE_SIZE_MB = 50
-MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+        await run_in_threadpool(database.update_document_by_id, document_id, {"status": "processing_failed", "error_message": str(e)})
+
+# Uploaded documents are handed to a fixed set of long-lived workers through a bounded
+# queue, so a burst of uploads waits in line (or is refused with 503 once the queue is
+# full) instead of spawning one pipeline per request
+DOCUMENT_QUEUE_MAXSIZE = 512
+DOCUMENT_WORKERS = PARSE_CONCURRENCY
+_document_queue: Optional[asyncio.Queue] = None
+_document_workers: List[asyncio.Task] = []
+
+async def _document_worker(queue: asyncio.Queue):
+    while True:
+        job = await queue.get()
+        try:
+            await process_document_pipeline(**job)
+        except Exception as e:
+            logger.error(f"Document worker failed on document_id {job.get('document_id')}: {e}")
+        finally:
+            queue.task_done()
+
+def get_document_queue() -> asyncio.Queue:
+    """Created on first use so the queue and its workers bind to the server's running event loop"""
+    global _document_queue
+    if _document_queue is None:
+        _document_queue = asyncio.Queue(maxsize=DOCUMENT_QUEUE_MAXSIZE)
+        for _ in range(DOCUMENT_WORKERS):
+            _document_workers.append(asyncio.create_task(_document_worker(_document_queue)))
+    return _document_queue
+
+@app.on_event("shutdown")
+async def shutdown_document_workers():
+    for task in _document_workers:
+        task.cancel()
+    await asyncio.gather(*_document_workers, return_exceptions=True)
+    _document_workers.clear()
+
+ALLOWED_EXTENSIONS = frozenset({".pdf", ".docx", ".txt", ".csv", ".xlsx"})
+ALLOWED_EXTENSIONS_TEXT = ", ".join(sorted(ALLOWED_EXTENSIONS))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# File-to-file sendfile is Linux-only
+_SENDFILE_SUPPORTED = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+
+def _save_upload(src: BinaryIO, dest: Path) -> int:
+    """
+    Copies an upload to disk in fixed-size chunks and returns the number of bytes seen.
+    Stops as soon as the size limit is exceeded, so callers should compare the result
+    against MAX_FILE_SIZE_BYTES. Blocking; run it in the threadpool.
+    """
+    # Larger uploads have already been rolled over from memory to a temp file by
+    # SpooledTemporaryFile; those are copied kernel-side without passing through Python
+    if _SENDFILE_SUPPORTED and getattr(src, "_rolled", False):
+        size = src.seek(0, os.SEEK_END)
+        if size > MAX_FILE_SIZE_BYTES:
+            return size
+        with open(dest, "wb") as f:
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(f.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        return size
+
+    size = 0
+    with open(dest, "wb") as f:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_FILE_SIZE_BYTES:
+                break
+            f.write(chunk)
+    return size
 
 @app.post("/api/upload")
 async def upload_document_for_intelligence(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user=Depends(get_current_user) # Assuming get_current_user provides user object with an id attribute
 ):
     """
-    Uploads a document, stores metadata in MongoDB, and triggers a background task
-    for text extraction and analysis.
+    Uploads a document, stores metadata in MongoDB, and queues it for text extraction
+    and analysis by the document workers.
     """
+    document_queue = get_document_queue()
+    if document_queue.full():
+        raise HTTPException(status_code=503, detail="Document processing queue is full. Please retry shortly.")
+
     original_filename = file.filename
-    file_extension = Path(original_filename).suffix.lower()
+    file_extension = os.path.splitext(original_filename)[1].lower()
 
     if file_extension not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported file type: '{file_extension}'. Allowed types are: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-
-    # Read file content to check size and save
-    file_content = await file.read()
-    file_size = len(file_content)
-
-    if file_size > MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=413, # Payload Too Large
-            detail=f"File size {file_size / (1024*1024):.2f}MB exceeds limit of {MAX_FILE_SIZE_MB}MB."
+            detail=f"Unsupported file type: '{file_extension}'. Allowed types are: {ALLOWED_EXTENSIONS_TEXT}"
         )
 
-    if file_size == 0:
-        raise HTTPException(status_code=400, detail="Cannot upload empty file.")
-
     # Generate a unique internal filename
     internal_filename = f"{str(uuid.uuid4())}{file_extension}"
     saved_file_path = UPLOAD_DIR / internal_filename
 
+    # Stream the upload to disk in fixed-size chunks off the event loop, enforcing the
+    # size limit as we go, so at most one chunk of the file is held in memory at a time
     try:
-        with open(saved_file_path, "wb") as f:
-            f.write(file_content)
+        file_size = await run_in_threadpool(_save_upload, file.file, saved_file_path)
     except Exception as e:
         logger.error(f"Failed to save uploaded file {original_filename} to {saved_file_path}: {e}")
+        saved_file_path.unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail="Could not save uploaded file.")
 
+    if file_size > MAX_FILE_SIZE_BYTES:
+        saved_file_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=413, # Payload Too Large
+            detail=f"File size exceeds limit of {MAX_FILE_SIZE_MB}MB."
+        )
+
+    if file_size == 0:
+        saved_file_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="Cannot upload empty file.")
+
     uploader_id_str = None
     if user and hasattr(user, 'id'):
         uploader_id_str = str(user.id)
@@ -530,7 +1047,7 @@ async def upload_document_for_intelligence(
         "file_extension": file_extension,
         "file_size": file_size,
         "user_id": uploader_id_str, # Changed from uploader_id to user_id
-        "upload_time": datetime.now().isoformat(),
+        "upload_time": iso_now(),
         "status": "uploaded", # Initial status
         "text": None,
         "word_count": None,
@@ -540,8 +1057,8 @@ async def upload_document_for_intelligence(
     }
 
     try:
-        document_id = database.insert_document(initial_doc_data)
-        logger.info(f"File '{original_filename}' (ID: {document_id}) metadata stored in MongoDB. Path: {saved_file_path}")
+        document_id = await run_in_threadpool(database.insert_document, initial_doc_data)
+        logger.info("File '%s' (ID: %s) metadata stored in MongoDB. Path: %s", original_filename, document_id, saved_file_path)
     except Exception as e:
         logger.error(f"Failed to insert document metadata into MongoDB for {original_filename}: {e}")
         # Potentially clean up the saved file if DB insert fails
@@ -549,24 +1066,21 @@ async def upload_document_for_intelligence(
             saved_file_path.unlink()
         raise HTTPException(status_code=500, detail="Failed to store document metadata.")
 
-    # Add the processing task to background
-    # background_tasks.add_task(
-    #     process_document_pipeline,
-    #     document_id=document_id,
-    #     internal_filename=internal_filename,
-    #     original_filename=original_filename,
-    #     file_content_type=file.content_type, # This should be file_extension for our text_processor
-    #     saved_file_path=str(saved_file_path)
-    # )
-    background_tasks.add_task(
-        process_document_pipeline,
-        document_id=document_id,
-        internal_filename=internal_filename,
-        original_filename=original_filename,
-        file_extension=file_extension, # Corrected to pass file_extension
-        saved_file_path=str(saved_file_path)
-    )
-    logger.info(f"Background task added for document ID {document_id} to process file {original_filename}")
+    try:
+        document_queue.put_nowait({
+            "document_id": document_id,
+            "internal_filename": internal_filename,
+            "original_filename": original_filename,
+            "file_extension": file_extension,
+            "saved_file_path": str(saved_file_path),
+        })
+    except asyncio.QueueFull:
+        # The queue filled up while this upload was being saved
+        logger.warning("Document queue full; rejecting document ID %s", document_id)
+        await run_in_threadpool(database.update_document_by_id, document_id, {"status": "processing_failed", "error_message": "Processing queue was full."})
+        saved_file_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=503, detail="Document processing queue is full. Please retry shortly.")
+    logger.info("Queued document ID %s for processing of file %s", document_id, original_filename)
 
     return {
         "message": "File uploaded successfully. Processing started in background.",
@@ -580,8 +1094,8 @@ async def generate_document_report(document_id: str):
     """
     Generates a JSON report for a processed document.
     """
-    logger.info(f"Report generation request for document_id: {document_id}")
-    doc = database.get_document_by_id(document_id)
+    logger.info("Report generation request for document_id: %s", document_id)
+    doc = await run_in_threadpool(database.get_document_by_id, document_id)
 
     if not doc:
         logger.warning(f"Report generation: Document not found for ID {document_id}")
@@ -610,7 +1124,7 @@ async def generate_document_report(document_id: str):
     # Though ideally, 'analyzed' status means they should be.
     report_cleaned = {k: v for k, v in report.items() if v is not None}
 
-    logger.info(f"Report generated successfully for document_id: {document_id}")
+    logger.info("Report generated successfully for document_id: %s", document_id)
     return report_cleaned
 
 @app.get("/api/files")
@@ -620,20 +1134,13 @@ async def list_files(user=Depends(get_current_user)): # This existing endpoint s
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
             
-        result = supabase.table("uploaded_files").select("*").eq("user_id", user.id).execute()
-        
-        files = []
-        for file_record in result.data:
-            files.append({
-                "file_id": file_record["id"],
-                "filename": file_record["filename"],
-                "file_type": file_record["file_type"],
-                "file_size": file_record["file_size"],
-                "processing_status": file_record["processing_status"],
-                "uploaded_at": file_record["uploaded_at"]
-            })
+        # Select and rename only the listed columns in PostgREST (file_id:id aliases id),
+        # so rows come back in response shape and processed_data never leaves the DB
+        result = await postgrest_db.table("uploaded_files").select(
+            "file_id:id,filename,file_type,file_size,processing_status,uploaded_at"
+        ).eq("user_id", user.id).execute()
             
-        return {"files": files}
+        return {"files": result.data}
         
     except Exception as e:
         logger.error(f"File listing error: {str(e)}")
@@ -646,21 +1153,14 @@ async def get_file_details(file_id: str, user=Depends(get_current_user)):
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
             
-        result = supabase.table("uploaded_files").select("*").eq("id", file_id).eq("user_id", user.id).execute()
+        result = await postgrest_db.table("uploaded_files").select(
+            "file_id:id,filename,file_type,file_size,processing_status,processed_data,uploaded_at"
+        ).eq("id", file_id).eq("user_id", user.id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="File not found")
             
-        file_record = result.data[0]
-        return {
-            "file_id": file_record["id"],
-            "filename": file_record["filename"],
-            "file_type": file_record["file_type"],
-            "file_size": file_record["file_size"],
-            "processing_status": file_record["processing_status"],
-            "processed_data": file_record["processed_data"],
-            "uploaded_at": file_record["uploaded_at"]
-        }
+        return result.data[0]
         
     except HTTPException:
         raise
@@ -668,6 +1168,40 @@ async def get_file_details(file_id: str, user=Depends(get_current_user)):
         logger.error(f"File details error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get file details: {str(e)}")
 
+# AI analyses by (user id, file id, analysis type, additional context)
+_file_analysis_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+_file_analysis_locks: Dict[tuple, asyncio.Lock] = {}
+
+async def _run_file_analysis(file_id: str, request: FileAnalysisRequest, user, now_iso: str) -> Dict[str, Any]:
+    """Loads the file's processed data, runs the AI analysis and stores the result"""
+    # Get file record
+    result = await postgrest_db.table("uploaded_files").select("processed_data").eq("id", file_id).eq("user_id", user.id).execute()
+    
+    if not result.data:
+        raise HTTPException(status_code=404, detail="File not found")
+        
+    processed_data = result.data[0]["processed_data"]
+    
+    # Generate enhanced AI analysis
+    ai_analysis = await ai_agent.process_file_with_ai(
+        processed_data, 
+        request.additional_context or request.analysis_type,
+        now_iso=now_iso
+    )
+    
+    # Store analysis result
+    analysis_record = {
+        "file_id": file_id,
+        "user_id": user.id,
+        "analysis_type": request.analysis_type,
+        "analysis_result": ai_analysis,
+        "additional_context": request.additional_context,
+        "created_at": now_iso
+    }
+    
+    await postgrest_db.table("file_analyses").insert(analysis_record).execute()
+    return ai_analysis
+
 @app.post("/api/files/{file_id}/analyze")
 async def analyze_file(
     file_id: str, 
@@ -678,39 +1212,29 @@ async def analyze_file(
     try:
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
-            
-        # Get file record
-        result = supabase.table("uploaded_files").select("*").eq("id", file_id).eq("user_id", user.id).execute()
-        
-        if not result.data:
-            raise HTTPException(status_code=404, detail="File not found")
-            
-        file_record = result.data[0]
-        processed_data = file_record["processed_data"]
-        
-        # Generate enhanced AI analysis
-        ai_analysis = await ai_agent.process_file_with_ai(
-            processed_data, 
-            request.additional_context or request.analysis_type
-        )
-        
-        # Store analysis result
-        analysis_record = {
-            "file_id": file_id,
-            "user_id": user.id,
-            "analysis_type": request.analysis_type,
-            "analysis_result": ai_analysis,
-            "additional_context": request.additional_context,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        supabase.table("file_analyses").insert(analysis_record).execute()
+
+        now_iso = iso_now()
+        # processed_data never changes after upload, so an analysis with the same inputs
+        # is reused for an hour; concurrent duplicates wait on one computation
+        cache_key = (user.id, file_id, request.analysis_type, request.additional_context)
+        ai_analysis = _file_analysis_cache.get(cache_key)
+        if ai_analysis is None:
+            lock = _file_analysis_locks.setdefault(cache_key, asyncio.Lock())
+            try:
+                async with lock:
+                    ai_analysis = _file_analysis_cache.get(cache_key)
+                    if ai_analysis is None:
+                        ai_analysis = await _run_file_analysis(file_id, request, user, now_iso)
+                        _file_analysis_cache[cache_key] = ai_analysis
+            finally:
+                if not lock.locked():
+                    _file_analysis_locks.pop(cache_key, None)
         
         return {
             "file_id": file_id,
             "analysis_type": request.analysis_type,
             "analysis_result": ai_analysis,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
     except HTTPException:
@@ -727,7 +1251,7 @@ async def get_data_sources(user=Depends(get_current_user)):
         if not supabase:
             return []
             
-        result = supabase.table("data_sources").select("*").eq("user_id", user.id).execute()
+        result = await postgrest_db.table("data_sources").select("*").eq("user_id", user.id).execute()
         return result.data
         
     except Exception as e:
@@ -740,7 +1264,8 @@ async def create_data_source(data_source: DataSource, user=Depends(get_current_u
     try:
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
-            
+
+        now_iso = iso_now()
         data_source_record = {
             "user_id": user.id,
             "name": data_source.name,
@@ -749,11 +1274,11 @@ async def create_data_source(data_source: DataSource, user=Depends(get_current_u
             "category": data_source.category,
             "config": data_source.config,
             "status": data_source.status,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
+            "created_at": now_iso,
+            "updated_at": now_iso
         }
         
-        result = supabase.table("data_sources").insert(data_source_record).execute()
+        result = await postgrest_db.table("data_sources").insert(data_source_record).execute()
         return result.data[0]
         
     except Exception as e:
@@ -778,10 +1303,10 @@ async def update_data_source(
             "category": data_source.category,
             "config": data_source.config,
             "status": data_source.status,
-            "updated_at": datetime.now().isoformat()
+            "updated_at": iso_now()
         }
         
-        result = supabase.table("data_sources").update(update_data).eq("id", source_id).eq("user_id", user.id).execute()
+        result = await postgrest_db.table("data_sources").update(update_data).eq("id", source_id).eq("user_id", user.id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Data source not found")
@@ -801,7 +1326,7 @@ async def delete_data_source(source_id: str, user=Depends(get_current_user)):
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
             
-        result = supabase.table("data_sources").delete().eq("id", source_id).eq("user_id", user.id).execute()
+        result = await postgrest_db.table("data_sources").delete().eq("id", source_id).eq("user_id", user.id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Data source not found")
@@ -821,31 +1346,30 @@ async def test_data_source(source_id: str, user=Depends(get_current_user)):
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
             
-        result = supabase.table("data_sources").select("*").eq("id", source_id).eq("user_id", user.id).execute()
+        # Mock connection test - in production, implement actual API testing
+        test_successful = True
+        now_iso = iso_now()
+
+        # Update data source status; the returned row doubles as the lookup
+        result = await postgrest_db.table("data_sources").update({
+            "status": "active" if test_successful else "error",
+            "last_sync": now_iso,
+            "updated_at": now_iso
+        }).eq("id", source_id).eq("user_id", user.id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Data source not found")
             
         data_source = result.data[0]
         
-        # Mock connection test - in production, implement actual API testing
-        test_result = {
-            "test_successful": True,
+        return {
+            "test_successful": test_successful,
             "tested_service_type": data_source["type"],
             "message": f"Successfully connected to {data_source['name']}",
             "response_time_ms": 150,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
-        # Update data source status
-        supabase.table("data_sources").update({
-            "status": "active" if test_result["test_successful"] else "error",
-            "last_sync": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        }).eq("id", source_id).execute()
-        
-        return test_result
-        
     except HTTPException:
         raise
     except Exception as e:
@@ -859,139 +1383,211 @@ async def sync_data_source(source_id: str, user=Depends(get_current_user)):
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
             
-        result = supabase.table("data_sources").select("*").eq("id", source_id).eq("user_id", user.id).execute()
+        # Mock sync process - in production, implement actual data syncing
+        now_iso = iso_now()
+
+        # Update last sync timestamp; the returned row doubles as the lookup
+        result = await postgrest_db.table("data_sources").update({
+            "last_sync": now_iso,
+            "updated_at": now_iso
+        }).eq("id", source_id).eq("user_id", user.id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Data source not found")
             
         data_source = result.data[0]
         
-        # Mock sync process - in production, implement actual data syncing
-        sync_result = {
+        return {
             "sync_successful": True,
             "records_synced": 150,
             "message": f"Successfully synced data from {data_source['name']}",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
         
-        # Update last sync timestamp
-        supabase.table("data_sources").update({
-            "last_sync": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        }).eq("id", source_id).execute()
-        
-        return sync_result
-        
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Data source sync error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Data source sync failed: {str(e)}")
 
+# KPI blocks that don't depend on the query parameters
+_KPI_CONVERSION = {"current": 3.2, "previous": 2.8, "change": 14.3, "trend": "up"}
+_KPI_SATISFACTION = {"current": 4.6, "previous": 4.4, "change": 4.5, "trend": "up"}
+
+def stable_hash(value: str) -> int:
+    """
+    64-bit hash of a string that, unlike hash(), is the same in every process and
+    worker regardless of PYTHONHASHSEED
+    """
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+
+# Mock KPI variation for the timeframes/categories the dashboard actually sends,
+# computed once; any other value falls back to hashing on the fly
+_REVENUE_VARIATION = {tf: stable_hash(tf) % 10000 for tf in ("7d", "30d", "90d", "1y")}
+_CUSTOMER_VARIATION = {cat: stable_hash(cat) % 100 for cat in ("all",)}
+
+# Serialized KPI payloads by (timeframe, category); the payload only varies with those
+_kpi_response_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+# KPI payloads are the same for every caller, so browsers and CDNs may reuse them too
+KPI_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (a list of tags, or "*") against etag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque_tag:
+            return True
+    return False
+
+def _kpi_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"Cache-Control": KPI_CACHE_CONTROL, "ETag": etag}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/api/kpi")
-async def get_kpi(timeframe: str = "30d", category: str = "all"):
-    try:
-        logger.info(f"KPI request: timeframe={timeframe}, category={category}")
-
-        # Enhanced KPI data with dynamic generation
-        kpi_data = {
-            "revenue": {
-                "current": 125000 + (hash(timeframe) % 10000),
-                "previous": 118000,
-                "change": 5.9,
-                "trend": "up"
-            },
-            "customers": {
-                "current": 1250 + (hash(category) % 100),
-                "previous": 1180,
-                "change": 5.9,
-                "trend": "up"
-            },
-            "conversion": {
-                "current": 3.2,
-                "previous": 2.8,
-                "change": 14.3,
-                "trend": "up"
-            },
-            "satisfaction": {
-                "current": 4.6,
-                "previous": 4.4,
-                "change": 4.5,
-                "trend": "up"
-            },
-            "metadata": {
-                "timeframe": timeframe,
-                "category": category,
-                "last_updated": datetime.now().isoformat(),
-                "data_quality": "high"
-            }
+async def get_kpi(request: Request, timeframe: str = "30d", category: str = "all"):
+    logger.info("KPI request: timeframe=%s, category=%s", timeframe, category)
+
+    cached = _kpi_response_cache.get((timeframe, category))
+    if cached is not None:
+        return _kpi_response(request, *cached)
+
+    revenue_variation = _REVENUE_VARIATION.get(timeframe)
+    if revenue_variation is None:
+        revenue_variation = stable_hash(timeframe) % 10000
+    customer_variation = _CUSTOMER_VARIATION.get(category)
+    if customer_variation is None:
+        customer_variation = stable_hash(category) % 100
+
+    # Enhanced KPI data with dynamic generation
+    kpi_data = {
+        "revenue": {
+            "current": 125000 + revenue_variation,
+            "previous": 118000,
+            "change": 5.9,
+            "trend": "up"
+        },
+        "customers": {
+            "current": 1250 + customer_variation,
+            "previous": 1180,
+            "change": 5.9,
+            "trend": "up"
+        },
+        "conversion": _KPI_CONVERSION,
+        "satisfaction": _KPI_SATISFACTION,
+        "metadata": {
+            "timeframe": timeframe,
+            "category": category,
+            "last_updated": iso_now(),
+            "data_quality": "high"
         }
+    }
 
-        return kpi_data
-    except Exception as e:
-        logger.error(f"KPI error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"KPI fetch failed: {str(e)}")
+    body = orjson.dumps(kpi_data)
+    # Weak, because GZipMiddleware may compress the body without touching the ETag,
+    # and byte-different representations must not share a strong validator
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    _kpi_response_cache[(timeframe, category)] = (body, etag)
+    return _kpi_response(request, body, etag)
 
 @app.post("/api/kpi")
 async def store_kpi(request: KPIRequest):
-    try:
-        logger.info(f"Storing KPI: {request.metric} = {request.value}")
-
-        # Enhanced KPI storage
-        stored_data = {
-            "success": True,
-            "metric": request.metric,
-            "value": request.value,
-            "timestamp": request.timestamp or datetime.now().isoformat(),
-            "id": f"kpi_{hash(request.metric)}_{int(datetime.now().timestamp())}"
-        }
+    logger.info("Storing KPI: %s = %s", request.metric, request.value)
+
+    # Enhanced KPI storage
+    stored_data = {
+        "success": True,
+        "metric": request.metric,
+        "value": request.value,
+        "timestamp": request.timestamp or iso_now(),
+        "id": f"kpi_{uuid.uuid4().hex}"
+    }
 
-        return stored_data
-    except Exception as e:
-        logger.error(f"KPI storage error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"KPI storage failed: {str(e)}")
+    return ORJSONResponse(stored_data)
 
 @app.post("/api/agent/sync")
 async def agent_sync(request: AgentSyncRequest):
-    try:
-        logger.info(f"Agent sync: action={request.action}")
-
-        # Enhanced agent sync with more actions
-        sync_result = {
-            "success": True,
-            "action": request.action,
-            "data": request.data,
-            "status": "completed",
-            "timestamp": datetime.now().isoformat(),
-            "sync_id": f"sync_{hash(request.action)}_{int(datetime.now().timestamp())}"
-        }
+    logger.info("Agent sync: action=%s", request.action)
+
+    # Enhanced agent sync with more actions
+    sync_result = {
+        "success": True,
+        "action": request.action,
+        "data": request.data,
+        "status": "completed",
+        "timestamp": iso_now(),
+        "sync_id": f"sync_{uuid.uuid4().hex}"
+    }
 
-        return sync_result
-    except Exception as e:
-        logger.error(f"Agent sync error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Agent sync failed: {str(e)}")
+    return ORJSONResponse(sync_result)
+
+# Everything in the status payload except the timestamp is fixed, so it is built once
+_AGENT_STATUS = {
+    "status": "online",
+    "version": "1.0.0",
+    "uptime": "running",
+    "capabilities": (
+        "market_analysis",
+        "chat_interface",
+        "kpi_tracking",
+        "data_sync",
+        "file_processing",
+        "rag_search",
+        "ai_insights"
+    ),
+    "ai_models": ("google-gemini",),
+    "file_types_supported": (".csv", ".xlsx", ".pdf", ".txt")
+}
+
+# Serialized once with the closing brace left off so the timestamp can be appended
+_AGENT_STATUS_PREFIX = orjson.dumps(_AGENT_STATUS)[:-1] + b',"timestamp":"'
 
 @app.get("/api/agent/status")
 async def agent_status():
+    return Response(
+        content=_AGENT_STATUS_PREFIX + iso_now().encode() + b'"}',
+        media_type="application/json"
+    )
+
+# Report Generation Endpoints
+# PostgREST (schema cache) and Postgres codes for a function that does not exist
+_MISSING_FUNCTION_CODES = frozenset({"PGRST202", "42883"})
+
+async def _fetch_report_bundle(user_id: str, limit: int) -> Dict[str, Any]:
+    """
+    Returns the user's latest analyses and files plus their total counts. Uses the
+    get_report_bundle RPC from scripts/03_report_functions.sql for a single round-trip,
+    and falls back to two table queries on databases where it has not been installed.
+    """
+    try:
+        bundle = await postgrest_db.rpc("get_report_bundle", {"uid": user_id, "lim": limit}).execute()
+        return bundle.data
+    except APIError as e:
+        if e.code not in _MISSING_FUNCTION_CODES:
+            raise
+        logger.warning("get_report_bundle is not installed; run scripts/03_report_functions.sql. Falling back to table queries")
+
+    analyses, files = await asyncio.gather(
+        postgrest_db.table("market_analyses").select("*", count=CountMethod.exact)
+            .eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute(),
+        postgrest_db.table("uploaded_files").select("filename,file_type,uploaded_at", count=CountMethod.exact)
+            .eq("user_id", user_id).order("uploaded_at", desc=True).limit(limit).execute(),
+    )
     return {
-        "status": "online",
-        "version": "1.0.0",
-        "uptime": "running",
-        "capabilities": [
-            "market_analysis",
-            "chat_interface",
-            "kpi_tracking",
-            "data_sync",
-            "file_processing",
-            "rag_search",
-            "ai_insights"
-        ],
-        "ai_models": ["google-gemini"],
-        "file_types_supported": [".csv", ".xlsx", ".pdf", ".txt"],
-        "timestamp": datetime.now().isoformat()
+        "analysis_count": analyses.count or 0,
+        "file_count": files.count or 0,
+        "analyses": analyses.data,
+        "files": files.data
     }
 
-# Report Generation Endpoints
 @app.post("/api/reports/generate")
 async def generate_report(
     report_type: str = "comprehensive",
@@ -1003,27 +1599,28 @@ async def generate_report(
         if not supabase:
             raise HTTPException(status_code=500, detail="Database not configured")
 
-        # Get user's data for report generation
-        analyses = supabase.table("market_analyses").select("*").eq("user_id", user.id).limit(10).execute()
-        files = supabase.table("uploaded_files").select("*").eq("user_id", user.id).limit(10).execute()
+        # Only the rows shown in the report are fetched; totals come back as counts
+        bundle = await _fetch_report_bundle(user.id, 5)
+        analyses = bundle["analyses"]
+        files = bundle["files"]
         
         report_data = {
             "report_id": str(uuid.uuid4()),
             "report_type": report_type,
             "user_id": user.id,
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": iso_now(),
             "summary": {
-                "total_analyses": len(analyses.data),
-                "total_files": len(files.data),
-                "most_recent_analysis": analyses.data[0]["created_at"] if analyses.data else None
+                "total_analyses": bundle["analysis_count"],
+                "total_files": bundle["file_count"],
+                "most_recent_analysis": analyses[0]["created_at"] if analyses else None
             },
-            "analyses": analyses.data[:5],  # Latest 5 analyses
+            "analyses": analyses,  # Latest 5 analyses
             "file_summary": [
                 {
                     "filename": f["filename"],
                     "type": f["file_type"],
                     "uploaded": f["uploaded_at"]
-                } for f in files.data[:5]
+                } for f in files
             ]
         }
         
@@ -1042,6 +1639,19 @@ async def generate_report(
         logger.error(f"Report generation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
+_REPORT_CSV_HEADER = "Section,Content\n"
+
+def _iter_report_csv(sections: List[Dict[str, str]]):
+    """Yields the report as CSV one row at a time, reusing a single small buffer"""
+    yield _REPORT_CSV_HEADER
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for section in sections:
+        writer.writerow((section["title"], section["content"]))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
 @app.get("/api/reports/{report_id}/download")
 async def download_report(report_id: str, format: str = "json"):
     """Download a generated report"""
@@ -1050,7 +1660,7 @@ async def download_report(report_id: str, format: str = "json"):
         mock_report = {
             "report_id": report_id,
             "title": "Market Intelligence Report",
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": iso_now(),
             "sections": [
                 {
                     "title": "Executive Summary",
@@ -1064,15 +1674,9 @@ async def download_report(report_id: str, format: str = "json"):
         }
         
         if format == "csv":
-            # Convert to CSV format
-            import io
-            output = io.StringIO()
-            output.write("Section,Content\n")
-            for section in mock_report["sections"]:
-                output.write(f'"{section["title"]}","{section["content"]}"\n')
-            
-            return JSONResponse(
-                content={"csv_data": output.getvalue()},
+            return StreamingResponse(
+                _iter_report_csv(mock_report["sections"]),
+                media_type="text/csv",
                 headers={"Content-Disposition": f"attachment; filename=report_{report_id}.csv"}
             )
         
@@ -1088,4 +1692,23 @@ if __name__ == "__main__":
 
     logger.info(f"Starting Enhanced Market Intelligence Agent API on {host}:{port}")
     logger.info("Features: File Upload, RAG Chat, AI Analysis, Data Integration")
-    uvicorn.run(app, host=host, port=port, log_level="info")
+    # uvloop and httptools come with uvicorn[standard]; naming them makes a missing
+    # install fail loudly instead of silently falling back to asyncio and h11
+    # A single web worker by default; WEB_CONCURRENCY opts into more. Each worker is a
+    # separate process with its own auth, KPI, file-analysis and keyword caches (never
+    # invalidated across workers, so a revoked token or stale KPI can linger in the
+    # others until its TTL expires) and its own extraction pool of up to
+    # PARSE_CONCURRENCY processes. ENVIRONMENT=development runs one auto-reloading process.
+    reload = os.getenv("ENVIRONMENT") == "development"
+    workers = 1 if reload else int(os.getenv("WEB_CONCURRENCY", 1))
+    uvicorn.run(
+        # Reload and multiple workers need an import string so each process can load the app
+        "api.main:app" if reload or workers > 1 else app,
+        host=host,
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        reload=reload,
+        log_level="info"
+    )
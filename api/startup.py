@@ -1,7 +1,17 @@
 import os
 import sys
+import json
+import time
+import asyncio
+import hashlib
 import logging
 from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl  # POSIX only; without it concurrent workers may each probe the APIs
+except ImportError:
+    fcntl = None
 
 # Add the current directory to Python path
 current_dir = Path(__file__).parent
@@ -21,18 +31,15 @@ logger = logging.getLogger(__name__)
 
 def check_environment():
     """Check if all required environment variables are set"""
-    required_vars = [
+    required_vars = (
         'SUPABASE_URL',
         'SUPABASE_ANON_KEY',
         'GOOGLE_API_KEY',
         'NEWS_API_KEY',
         'TAVILY_API_KEY'
-    ]
+    )
     
-    missing_vars = []
-    for var in required_vars:
-        if not os.getenv(var):
-            missing_vars.append(var)
+    missing_vars = [var for var in required_vars if not os.environ.get(var)]
     
     if missing_vars:
         logger.warning(f"Missing environment variables: {', '.join(missing_vars)}")
@@ -52,11 +59,73 @@ def initialize_database():
         logger.error(f"Failed to initialize database: {e}")
         return False
 
+# Probe results are shared through a per-user cache file for a few minutes, so when
+# several workers boot together only the first one calls the external APIs
+API_PROBE_TTL_SECONDS = 300
+
+def _probe_cache_dir() -> Optional[Path]:
+    """
+    Returns a private (0700, owned by the current user) directory for the probe cache,
+    or None if one cannot be set up, in which case results are not cached.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    cache_dir = Path(base) / "mia-app"
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if os.name == "posix":
+            st = cache_dir.lstat()
+            # Refuse a directory another user could have planted or can write into
+            if cache_dir.is_symlink() or st.st_uid != os.getuid():
+                return None
+            if st.st_mode & 0o077:
+                os.chmod(cache_dir, 0o700)
+    except OSError:
+        return None
+    return cache_dir
+
+def _credentials_digest() -> str:
+    """Hash of the probed credentials, so rotating a key invalidates cached results"""
+    from test_api_keys import API_ENV_VARS
+    digest = hashlib.blake2b(digest_size=16)
+    for name in API_ENV_VARS:
+        digest.update(f"{name}={os.environ.get(name) or ''}\0".encode())
+    return digest.hexdigest()
+
+def _run_probe():
+    from test_api_keys import check_all_apis
+    return asyncio.run(check_all_apis())
+
+def probe_apis():
+    """Return cached API probe results if fresh, otherwise probe and cache them"""
+    cache_dir = _probe_cache_dir()
+    if cache_dir is None:
+        return _run_probe()
+
+    key = _credentials_digest()
+    cache_path = cache_dir / "api_probe.json"
+    with open(cache_dir / "api_probe.lock", "w") as lock:
+        # Workers that arrive while a probe is running wait for it and reuse its results
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if time.time() - cache_path.stat().st_mtime < API_PROBE_TTL_SECONDS:
+                cached = json.loads(cache_path.read_text())
+                if cached.get("key") == key:
+                    return cached["results"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+        results = _run_probe()
+
+        tmp_path = cache_dir / f"api_probe.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps({"key": key, "results": results}))
+        os.replace(tmp_path, cache_path)
+        return results
+
 def test_api_connections():
     """Test connections to external APIs"""
     try:
-        from test_api_keys import test_all_apis
-        results = test_all_apis()
+        results = probe_apis()
         
         working_apis = sum(1 for result in results.values() if result)
         total_apis = len(results)
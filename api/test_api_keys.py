@@ -1,171 +1,188 @@
 import os
-import requests
+import asyncio
+import aiohttp
 import logging
-from typing import Dict, bool
+from typing import Dict
 
 logger = logging.getLogger(__name__)
 
-def test_news_api() -> bool:
+# Environment variables holding the credentials the checks use
+API_ENV_VARS = (
+    "NEWS_API_KEY",
+    "MEDIASTACK_API_KEY",
+    "TAVILY_API_KEY",
+    "SERPAPI_API_KEY",
+    "ALPHA_VANTAGE_API_KEY",
+    "GOOGLE_API_KEY",
+    "SUPABASE_URL",
+    "SUPABASE_ANON_KEY",
+)
+
+# Credentials are read once when the module loads
+_ENV = {name: os.environ.get(name) for name in API_ENV_VARS}
+
+async def check_news_api(session: aiohttp.ClientSession) -> bool:
     """Test News API connection"""
-    api_key = os.getenv("NEWS_API_KEY")
+    api_key = _ENV["NEWS_API_KEY"]
     if not api_key:
         return False
     
     try:
-        response = requests.get(
+        async with session.get(
             "https://newsapi.org/v2/top-headlines",
-            params={"country": "us", "pageSize": 1, "apiKey": api_key},
-            timeout=10
-        )
-        return response.status_code == 200
+            params={"country": "us", "pageSize": 1, "apiKey": api_key}
+        ) as response:
+            return response.status == 200
     except Exception as e:
         logger.error(f"News API test failed: {e}")
         return False
 
-def test_mediastack_api() -> bool:
+async def check_mediastack_api(session: aiohttp.ClientSession) -> bool:
     """Test MediaStack API connection"""
-    api_key = os.getenv("MEDIASTACK_API_KEY")
+    api_key = _ENV["MEDIASTACK_API_KEY"]
     if not api_key:
         return False
     
     try:
-        response = requests.get(
+        async with session.get(
             "http://api.mediastack.com/v1/news",
-            params={"access_key": api_key, "limit": 1},
-            timeout=10
-        )
-        return response.status_code == 200
+            params={"access_key": api_key, "limit": 1}
+        ) as response:
+            return response.status == 200
     except Exception as e:
         logger.error(f"MediaStack API test failed: {e}")
         return False
 
-def test_tavily_api() -> bool:
+async def check_tavily_api(session: aiohttp.ClientSession) -> bool:
     """Test Tavily API connection"""
-    api_key = os.getenv("TAVILY_API_KEY")
+    api_key = _ENV["TAVILY_API_KEY"]
     if not api_key:
         return False
     
     try:
-        response = requests.post(
+        async with session.post(
             "https://api.tavily.com/search",
             json={
                 "api_key": api_key,
                 "query": "test",
                 "max_results": 1
-            },
-            timeout=10
-        )
-        return response.status_code == 200
+            }
+        ) as response:
+            return response.status == 200
     except Exception as e:
         logger.error(f"Tavily API test failed: {e}")
         return False
 
-def test_serpapi() -> bool:
+async def check_serpapi(session: aiohttp.ClientSession) -> bool:
     """Test SerpAPI connection"""
-    api_key = os.getenv("SERPAPI_API_KEY")
+    api_key = _ENV["SERPAPI_API_KEY"]
     if not api_key:
         return False
     
     try:
-        response = requests.get(
+        async with session.get(
             "https://serpapi.com/search",
             params={
                 "q": "test",
                 "api_key": api_key,
                 "engine": "google",
                 "num": 1
-            },
-            timeout=10
-        )
-        return response.status_code == 200
+            }
+        ) as response:
+            return response.status == 200
     except Exception as e:
         logger.error(f"SerpAPI test failed: {e}")
         return False
 
-def test_alpha_vantage() -> bool:
+async def check_alpha_vantage_api(session: aiohttp.ClientSession) -> bool:
     """Test Alpha Vantage API connection"""
-    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    api_key = _ENV["ALPHA_VANTAGE_API_KEY"]
     if not api_key:
         return False
     
     try:
-        response = requests.get(
+        async with session.get(
             "https://www.alphavantage.co/query",
             params={
                 "function": "GLOBAL_QUOTE",
                 "symbol": "AAPL",
                 "apikey": api_key
-            },
-            timeout=10
-        )
-        return response.status_code == 200
+            }
+        ) as response:
+            return response.status == 200
     except Exception as e:
         logger.error(f"Alpha Vantage API test failed: {e}")
         return False
 
-def test_google_gemini() -> bool:
+async def check_google_gemini_api(session: aiohttp.ClientSession) -> bool:
     """Test Google Gemini API connection"""
-    api_key = os.getenv("GOOGLE_API_KEY")
+    api_key = _ENV["GOOGLE_API_KEY"]
     if not api_key:
         return False
     
     try:
         # Simple test to check if the API key is valid
-        response = requests.get(
-            f"https://generativelanguage.googleapis.com/v1/models?key={api_key}",
-            timeout=10
-        )
-        return response.status_code == 200
+        async with session.get(
+            f"https://generativelanguage.googleapis.com/v1/models?key={api_key}"
+        ) as response:
+            return response.status == 200
     except Exception as e:
         logger.error(f"Google Gemini API test failed: {e}")
         return False
 
-def test_supabase() -> bool:
+async def check_supabase_api(session: aiohttp.ClientSession) -> bool:
     """Test Supabase connection"""
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_ANON_KEY")
+    url = _ENV["SUPABASE_URL"]
+    key = _ENV["SUPABASE_ANON_KEY"]
     
     if not url or not key:
         return False
     
     try:
-        response = requests.get(
+        async with session.get(
             f"{url}/rest/v1/",
             headers={
                 "apikey": key,
                 "Authorization": f"Bearer {key}"
-            },
-            timeout=10
-        )
-        return response.status_code in [200, 404]  # 404 is OK, means connection works
+            }
+        ) as response:
+            return response.status in [200, 404]  # 404 is OK, means connection works
     except Exception as e:
         logger.error(f"Supabase test failed: {e}")
         return False
 
-def test_all_apis() -> Dict[str, bool]:
-    """Test all API connections and return results"""
+async def check_all_apis() -> Dict[str, bool]:
+    """Test all API connections concurrently over one shared session and return results"""
     tests = {
-        "News API": test_news_api,
-        "MediaStack": test_mediastack_api,
-        "Tavily": test_tavily_api,
-        "SerpAPI": test_serpapi,
-        "Alpha Vantage": test_alpha_vantage,
-        "Google Gemini": test_google_gemini,
-        "Supabase": test_supabase,
+        "News API": check_news_api,
+        "MediaStack": check_mediastack_api,
+        "Tavily": check_tavily_api,
+        "SerpAPI": check_serpapi,
+        "Alpha Vantage": check_alpha_vantage_api,
+        "Google Gemini": check_google_gemini_api,
+        "Supabase": check_supabase_api,
     }
-    
+
+    connector = aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        outcomes = await asyncio.gather(
+            *(test_func(session) for test_func in tests.values()),
+            return_exceptions=True
+        )
+
     results = {}
-    for name, test_func in tests.items():
-        try:
-            results[name] = test_func()
-        except Exception as e:
-            logger.error(f"Error testing {name}: {e}")
+    for name, outcome in zip(tests, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error testing {name}: {outcome}")
             results[name] = False
+        else:
+            results[name] = outcome
     
     return results
 
 if __name__ == "__main__":
-    results = test_all_apis()
+    results = asyncio.run(check_all_apis())
     print("\n=== API Connection Test Results ===")
     for api, status in results.items():
         status_icon = "✅" if status else "❌"
@@ -17,18 +17,28 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "api"))
 # Assuming database and text_processor are accessible for mocking or direct import
 try:
     from main import app # FastAPI app instance
+    import main
     from database import get_db, insert_document, get_document_by_id, update_document_by_id
-    from text_processor import extract_text_from_file, analyze_text_keywords
 except ImportError as e:
     print(f"Error importing modules for testing: {e}. Ensure your main app and modules are structured correctly.")
     # Fallback for running tests if main.py is complex to import directly in test env
     # This is a common issue with FastAPI app structure and testing.
     # A more robust solution involves a conftest.py or specific app factory for tests.
     app = None
+    main = None
     get_db = MagicMock()
     insert_document = MagicMock()
     get_document_by_id = MagicMock()
     update_document_by_id = MagicMock()
+
+# text_processor has no dependency on main, so its tests run against the real module
+# even when the app itself can't be imported
+try:
+    import text_processor
+    from text_processor import extract_text_from_file, analyze_text_keywords
+except ImportError as e:
+    print(f"Error importing text_processor for testing: {e}.")
+    text_processor = None
     extract_text_from_file = MagicMock()
     analyze_text_keywords = MagicMock()
 
@@ -123,11 +133,23 @@ class TestTextProcessor(unittest.TestCase):
         cls.dummy_csv_path = create_dummy_csv("sample_csv", {"header1": ["growth strategy data1"], "header2": ["other data1"]})
         cls.dummy_xlsx_path = create_dummy_xlsx("sample_xlsx", {"Sheet1": {"colA": ["xlsx growth strategy"], "colB": ["value"]}})
 
+        # Extract each fixture once; the tests below only assert on these results
+        cls._results = {
+            ext: extract_text_from_file(str(path), ext)
+            for ext, path in (
+                (".txt", cls.dummy_txt_path),
+                (".pdf", cls.dummy_pdf_path),
+                (".docx", cls.dummy_docx_path),
+                (".csv", cls.dummy_csv_path),
+                (".xlsx", cls.dummy_xlsx_path),
+            )
+            if path.exists() and os.path.getsize(path) > 0
+        }
 
     def test_extract_text_from_txt(self):
         if not self.dummy_txt_path.exists() or os.path.getsize(self.dummy_txt_path) == 0 :
             self.skipTest(f"TXT file {self.dummy_txt_path} not created or empty, skipping test.")
-        result = extract_text_from_file(str(self.dummy_txt_path), ".txt")
+        result = self._results[".txt"]
         self.assertIsNotNone(result)
         self.assertIn("test text", result["text"])
         self.assertEqual(result["word_count"], 7)
@@ -135,7 +157,7 @@ class TestTextProcessor(unittest.TestCase):
     def test_extract_text_from_pdf(self):
         if not self.dummy_pdf_path.exists() or os.path.getsize(self.dummy_pdf_path) == 0 :
             self.skipTest(f"PDF file {self.dummy_pdf_path} not created or empty, skipping test.")
-        result = extract_text_from_file(str(self.dummy_pdf_path), ".pdf")
+        result = self._results[".pdf"]
         self.assertIsNotNone(result)
         # Exact text depends on PyMuPDF's rendering, so check for keywords
         self.assertIn("pdf content", result["text"].lower())
@@ -145,7 +167,7 @@ class TestTextProcessor(unittest.TestCase):
     def test_extract_text_from_docx(self):
         if not self.dummy_docx_path.exists() or os.path.getsize(self.dummy_docx_path) == 0 :
             self.skipTest(f"DOCX file {self.dummy_docx_path} not created or empty, skipping test.")
-        result = extract_text_from_file(str(self.dummy_docx_path), ".docx")
+        result = self._results[".docx"]
         self.assertIsNotNone(result)
         self.assertIn("docx file", result["text"].lower())
         self.assertGreater(result["word_count"], 3)
@@ -153,16 +175,24 @@ class TestTextProcessor(unittest.TestCase):
     def test_extract_text_from_csv(self):
         if not self.dummy_csv_path.exists() or os.path.getsize(self.dummy_csv_path) == 0 :
             self.skipTest(f"CSV file {self.dummy_csv_path} not created or empty, skipping test.")
-        result = extract_text_from_file(str(self.dummy_csv_path), ".csv")
+        result = self._results[".csv"]
         self.assertIsNotNone(result)
         self.assertIn("growth strategy data1", result["text"].lower())
         self.assertIn("other data1", result["text"].lower())
         self.assertGreaterEqual(result["word_count"], 4) # "growth strategy data1 other data1"
 
+    @unittest.skipIf(text_processor is None, "text_processor dependencies not installed")
+    def test_extract_text_from_csv_keeps_raw_cell_text(self):
+        # Written by hand so pandas doesn't normalise the values on the way out
+        csv_path = create_dummy_file("raw_values_csv", "zip,price\n02139,1.50\n", extension=".csv")
+        text, word_count = text_processor.extract_text_from_csv(str(csv_path))
+        self.assertEqual(text, "02139\n1.50")
+        self.assertEqual(word_count, 2)
+
     def test_extract_text_from_xlsx(self):
         if not self.dummy_xlsx_path.exists() or os.path.getsize(self.dummy_xlsx_path) == 0 :
             self.skipTest(f"XLSX file {self.dummy_xlsx_path} not created or empty, skipping test.")
-        result = extract_text_from_file(str(self.dummy_xlsx_path), ".xlsx")
+        result = self._results[".xlsx"]
         self.assertIsNotNone(result)
         self.assertIn("xlsx growth strategy", result["text"].lower())
         self.assertGreaterEqual(result["word_count"], 3)
@@ -181,6 +211,110 @@ class TestTextProcessor(unittest.TestCase):
         self.assertFalse(result["market trends"])
         self.assertFalse(result["competitive landscape"])
 
+    @unittest.skipIf(text_processor is None, "text_processor dependencies not installed")
+    def test_extract_text_from_docx_matches_python_docx(self):
+        import docx
+        from docx.opc.constants import RELATIONSHIP_TYPE
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+
+        doc = docx.Document()
+        doc.add_paragraph("Plain paragraph about market trends.")
+        run = doc.add_paragraph().add_run("Before tab")
+        run.add_tab()
+        run.add_text("after tab")
+        run.add_break()
+        run.add_text("after break")
+        linked = doc.add_paragraph("See ")
+        hyperlink = OxmlElement("w:hyperlink")
+        hyperlink.set(qn("r:id"), linked.part.relate_to("https://example.com", RELATIONSHIP_TYPE.HYPERLINK, is_external=True))
+        link_run = OxmlElement("w:r")
+        link_text = OxmlElement("w:t")
+        link_text.text = "the linked report"
+        link_run.append(link_text)
+        hyperlink.append(link_run)
+        linked._p.append(hyperlink)
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "table cell text"
+        doc.add_paragraph("")
+        doc.add_paragraph("Closing paragraph.")
+        docx_path = TEST_FILES_DIR / "structured.docx"
+        doc.save(docx_path)
+
+        text, word_count = text_processor.extract_text_from_docx(str(docx_path))
+        # The streaming parser must give the same text as joining python-docx's body paragraphs
+        expected = "\n".join(paragraph.text for paragraph in docx.Document(str(docx_path)).paragraphs)
+        self.assertEqual(text, expected)
+        self.assertIn("the linked report", text)
+        self.assertNotIn("table cell text", text)
+        self.assertEqual(word_count, len(expected.split()))
+
+    @unittest.skipIf(text_processor is None, "text_processor dependencies not installed")
+    def test_extract_text_from_docx_does_not_expand_entities(self):
+        import docx
+        import zipfile
+
+        secret_path = TEST_FILES_DIR / "secret.txt"
+        secret_path.write_text("TOPSECRET", encoding="utf-8")
+        source_path = TEST_FILES_DIR / "entity_source.docx"
+        doc = docx.Document()
+        doc.add_paragraph("Visible paragraph.")
+        doc.add_paragraph("ENTITY_PLACEHOLDER")
+        doc.save(source_path)
+
+        # Rewrite document.xml with a DTD whose external entity points at a local file
+        docx_path = TEST_FILES_DIR / "entity.docx"
+        with zipfile.ZipFile(source_path) as src, zipfile.ZipFile(docx_path, "w") as dest:
+            for item in src.infolist():
+                data = src.read(item.filename)
+                if item.filename == "word/document.xml":
+                    xml = data.decode("utf-8")
+                    declaration, body = xml.split("?>", 1)
+                    doctype = f'<!DOCTYPE w:document [<!ENTITY secret SYSTEM "{secret_path.as_uri()}">]>'
+                    data = (declaration + "?>" + doctype + body.replace("ENTITY_PLACEHOLDER", "&secret;")).encode("utf-8")
+                dest.writestr(item, data)
+
+        text, _ = text_processor.extract_text_from_docx(str(docx_path))
+        self.assertIsNotNone(text)
+        self.assertIn("Visible paragraph.", text)
+        self.assertNotIn("TOPSECRET", text)
+
+    @unittest.skipIf(text_processor is None, "text_processor dependencies not installed")
+    def test_analyze_text_keywords_across_window_boundary(self):
+        # "Growth Strategy" starts 7 characters before the end of the first window
+        block = text_processor.KEYWORD_SCAN_BLOCK_CHARS
+        text = "a" * (block - 7) + "Growth Strategy" + "b" * block
+        result = analyze_text_keywords(text)
+        self.assertTrue(result["growth strategy"])
+        self.assertFalse(result["market trends"])
+        self.assertFalse(result["competitive landscape"])
+        self.assertFalse(result["customer behavior"])
+
+    @unittest.skipIf(text_processor is None, "text_processor dependencies not installed")
+    def test_analyze_text_keywords_stops_after_first_window(self):
+        windows = []
+
+        class RecordingText(str):
+            def __getitem__(self, key):
+                windows.append(key)
+                return super().__getitem__(key)
+
+        block = text_processor.KEYWORD_SCAN_BLOCK_CHARS
+        keywords = "Market trends, competitive landscape, customer behavior and growth strategy. "
+        result = analyze_text_keywords(RecordingText(keywords + "c" * (3 * block)))
+        self.assertTrue(all(result.values()))
+        # Every keyword is in the first window, so no later window is sliced
+        self.assertEqual([key.start for key in windows], [0])
+
+    @unittest.skipIf(text_processor is None, "text_processor dependencies not installed")
+    def test_count_words_long_ascii_matches_split(self):
+        # Long enough to take the NumPy byte scan rather than str.split()
+        text = "  lead\tword\r\nnext  line\x0bvt\x0cff\x1cfs   trailing \n" * 100 + " end\t\r\n"
+        self.assertGreaterEqual(len(text), text_processor.COUNT_WORDS_VECTOR_MIN_CHARS)
+        self.assertTrue(text.isascii())
+        self.assertEqual(text_processor.count_words(text), len(text.split()))
+        self.assertEqual(text_processor.count_words(" " * 5000), 0)
+
     @classmethod
     def tearDownClass(cls):
         # Clean up the temporary directory and files
@@ -192,6 +326,32 @@ class TestTextProcessor(unittest.TestCase):
                 print(f"Error removing test directory {TEST_FILES_DIR}: {e}")
 
 
+@unittest.skipIf(main is None, "main could not be imported")
+class TestFileProcessorText(unittest.TestCase):
+    def _process(self, data: bytes, block_bytes: int) -> dict:
+        import io
+        with patch.object(main, "TEXT_SCAN_BLOCK_BYTES", block_bytes):
+            return main.FileProcessor.process_text(io.BytesIO(data))
+
+    def test_process_text_matches_decoded_str_counts(self):
+        # NBSP and U+3000 are whitespace to str.split(); \xff is invalid UTF-8 and dropped
+        data = ("alpha\u00a0beta\u3000gamma caf\u00e9\n".encode("utf-8") + b"bad\xffbyte\tend\n") * 3
+        text = data.decode("utf-8", errors="ignore")
+        # Small blocks split multi-byte characters and words across block boundaries
+        for block_bytes in (1, 3, 7, len(data)):
+            result = self._process(data, block_bytes)
+            self.assertEqual(result["character_count"], len(text))
+            self.assertEqual(result["word_count"], len(text.split()))
+            self.assertEqual(result["line_count"], len(text.split("\n")))
+
+    def test_process_text_ascii(self):
+        data = b"one two\tthree\r\nfour  five\n"
+        result = self._process(data, 4)
+        self.assertEqual(result["character_count"], len(data))
+        self.assertEqual(result["word_count"], 5)
+        self.assertEqual(result["line_count"], 3)
+
+
 @patch('main.database', autospec=True) # Mock the entire database module used by main
 @patch('main.text_processor', autospec=True) # Mock the text_processor module
 class TestAPIEndpoints(unittest.TestCase):
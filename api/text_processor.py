@@ -1,38 +1,146 @@
+import os
+import mmap
+import hashlib
 import logging
+import threading
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
 import pandas as pd
 import pdfplumber
+import zipfile
 import docx # python-docx
-import openpyxl # For pandas to read xlsx
+from lxml import etree # installed with python-docx
+import openpyxl
+from cachetools import LRUCache
+
+try:
+    import pypdfium2 as pdfium  # installed alongside pdfplumber
+except ImportError:
+    pdfium = None
 
 logger = logging.getLogger(__name__)
 
+# Below this length str.split() is cheaper than setting up the NumPy scan
+COUNT_WORDS_VECTOR_MIN_CHARS = 4096
+# Lookup table for the characters str.split() treats as whitespace in ASCII text
+_ASCII_WHITESPACE = np.zeros(256, dtype=bool)
+_ASCII_WHITESPACE[[0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x1C, 0x1D, 0x1E, 0x1F, 0x20]] = True
+
 def count_words(text: str) -> int:
-    """Counts words in a given string."""
+    """
+    Counts words in a given string. Long ASCII text is counted on its bytes without
+    building the list of words; anything else falls back to str.split(), whose notion
+    of Unicode whitespace the byte scan can't reproduce.
+    """
     if not text:
         return 0
-    return len(text.split())
+    if len(text) < COUNT_WORDS_VECTOR_MIN_CHARS or not text.isascii():
+        return len(text.split())
+    is_space = _ASCII_WHITESPACE[np.frombuffer(text.encode("ascii"), dtype=np.uint8)]
+    # A word starts wherever a non-whitespace character follows whitespace
+    starts = ~is_space
+    starts[1:] &= is_space[:-1]
+    return int(np.count_nonzero(starts))
 
 def extract_text_from_pdf(file_path: str) -> tuple[Optional[str], int]:
-    """Extracts text from a PDF file using pdfplumber."""
+    """
+    Extracts text from a PDF file. Uses PDFium's native text extraction when pypdfium2
+    is available, which skips the per-character layout analysis pdfplumber performs.
+    """
     text_content = []
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content.append(page_text)
+        if pdfium is not None:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                for index in range(len(pdf)):
+                    page = pdf[index]
+                    textpage = page.get_textpage()
+                    try:
+                        # PDFium separates lines with CRLF; pdfplumber used LF
+                        page_text = textpage.get_text_range().replace("\r\n", "\n")
+                    finally:
+                        textpage.close()
+                        page.close()
+                    if page_text:
+                        text_content.append(page_text)
+            finally:
+                pdf.close()
+        else:
+            with pdfplumber.open(file_path) as pdf:
+                for page in pdf.pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        text_content.append(page_text)
         full_text = "\n".join(text_content)
         return full_text, count_words(full_text)
     except Exception as e:
         logger.error(f"Error extracting text from PDF {file_path}: {e}")
         return None, 0
 
+# WordprocessingML names used to pull paragraph text out of word/document.xml
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = _W + "body"
+_W_P = _W + "p"
+_W_R = _W + "r"
+_W_HYPERLINK = _W + "hyperlink"
+_W_T = _W + "t"
+_W_BR = _W + "br"
+_W_BR_TYPE = _W + "type"
+# Run children other than w:t and w:br, with the text python-docx renders them as
+_W_RUN_SYMBOLS = {_W + "cr": "\n", _W + "noBreakHyphen": "-", _W + "ptab": "\t", _W + "tab": "\t"}
+
+def _docx_paragraph_text(paragraph) -> str:
+    """Text of a w:p element, matching python-docx's Paragraph.text."""
+    parts = []
+    for child in paragraph.iterchildren(_W_R, _W_HYPERLINK):
+        runs = child.iterchildren(_W_R) if child.tag == _W_HYPERLINK else (child,)
+        for run in runs:
+            for element in run.iterchildren():
+                tag = element.tag
+                if tag == _W_T:
+                    parts.append(element.text or "")
+                elif tag == _W_BR:
+                    # Page and column breaks carry no text
+                    if element.get(_W_BR_TYPE, "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                else:
+                    symbol = _W_RUN_SYMBOLS.get(tag)
+                    if symbol:
+                        parts.append(symbol)
+    return "".join(parts)
+
 def extract_text_from_docx(file_path: str) -> tuple[Optional[str], int]:
-    """Extracts text from a DOCX file."""
+    """
+    Extracts text from a DOCX file. Body paragraphs are streamed straight out of
+    word/document.xml and discarded once read, rather than loading the document into
+    python-docx's object model.
+    """
     try:
-        doc = docx.Document(file_path)
-        text_content = [para.text for para in doc.paragraphs]
+        with zipfile.ZipFile(file_path) as archive:
+            if "word/document.xml" not in archive.namelist():
+                # Main part stored under a non-standard name; let python-docx resolve it
+                doc = docx.Document(file_path)
+                text_content = [para.text for para in doc.paragraphs]
+            else:
+                text_content = []
+                with archive.open("word/document.xml") as xml_file:
+                    # Same hardening as python-docx's own parser: the upload is untrusted,
+                    # and older lxml resolves entities (file:// included) by default
+                    paragraphs = etree.iterparse(
+                        xml_file, events=("end",), tag=_W_P,
+                        resolve_entities=False, load_dtd=False, no_network=True,
+                    )
+                    for _, paragraph in paragraphs:
+                        parent = paragraph.getparent()
+                        # Paragraphs inside tables, text boxes and revision marks are
+                        # not body paragraphs, and are dropped along with their container
+                        if parent is None or parent.tag != _W_BODY:
+                            continue
+                        text_content.append(_docx_paragraph_text(paragraph))
+                        paragraph.clear()
+                        while paragraph.getprevious() is not None:
+                            del parent[0]
         full_text = "\n".join(text_content)
         return full_text, count_words(full_text)
     except Exception as e:
@@ -40,25 +148,51 @@ def extract_text_from_docx(file_path: str) -> tuple[Optional[str], int]:
         return None, 0
 
 def extract_text_from_txt(file_path: str) -> tuple[Optional[str], int]:
-    """Extracts text from a TXT file."""
+    """
+    Extracts text from a TXT file. The file is memory-mapped and decoded straight from
+    the mapping, so no intermediate bytes copy of the file is made.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            full_text = f.read()
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return "", 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                full_text = str(mm, 'utf-8', 'ignore')
+        # Same newline translation as reading in text mode; replace() returns the
+        # string itself when there is nothing to translate
+        full_text = full_text.replace('\r\n', '\n').replace('\r', '\n')
         return full_text, count_words(full_text)
     except Exception as e:
         logger.error(f"Error extracting text from TXT {file_path}: {e}")
         return None, 0
 
+# CSVs above this size are read in chunks of CSV_TEXT_CHUNK_ROWS rows so only one
+# chunk's cells are held as Python objects at a time
+CSV_CHUNKED_THRESHOLD_BYTES = 20 * 1024 * 1024
+CSV_TEXT_CHUNK_ROWS = 65_536
+
 def extract_text_from_csv(file_path: str) -> tuple[Optional[str], int]:
     """Extracts text from a CSV file by concatenating all string columns."""
     try:
-        df = pd.read_csv(file_path, dtype=str, keep_default_na=False) # Read all as string initially
-        text_content = []
-        for col in df.columns:
-            # Only join non-empty string cells
-            col_text = df[col].astype(str).str.strip().replace('', pd.NA).dropna().str.cat(sep=' ')
-            if col_text:
-                 text_content.append(col_text)
+        # Read all as string with the C parser: the Arrow engine infers column types
+        # first and only then casts to str, which rewrites values like 02139 or 1.50
+        if Path(file_path).stat().st_size > CSV_CHUNKED_THRESHOLD_BYTES:
+            frames = pd.read_csv(file_path, dtype=str, keep_default_na=False, chunksize=CSV_TEXT_CHUNK_ROWS)
+        else:
+            frames = [pd.read_csv(file_path, dtype=str, keep_default_na=False)]
+
+        # Each column's text is built up chunk by chunk so the output keeps one line per column
+        column_parts = None
+        for df in frames:
+            if column_parts is None:
+                column_parts = [[] for _ in df.columns]
+            # One object array per chunk; each row of the transpose is a column
+            for parts, column in zip(column_parts, df.to_numpy(dtype=object).T):
+                # Only join non-empty string cells
+                col_text = " ".join(cell for cell in map(str.strip, column) if cell)
+                if col_text:
+                    parts.append(col_text)
+        text_content = [" ".join(parts) for parts in column_parts or [] if parts]
         full_text = "\n".join(text_content)
         return full_text, count_words(full_text)
     except Exception as e:
@@ -66,19 +200,32 @@ def extract_text_from_csv(file_path: str) -> tuple[Optional[str], int]:
         return None, 0
 
 def extract_text_from_excel(file_path: str) -> tuple[Optional[str], int]:
-    """Extracts text from an XLSX file by concatenating all string cells from all sheets."""
+    """
+    Extracts text from an XLSX file by concatenating all non-empty cells from all sheets.
+    The workbook is opened read-only, so rows are streamed from the sheet XML without
+    building a cell tree or parsing styles.
+    """
     try:
-        xls = pd.ExcelFile(file_path)
-        all_sheets_text = []
-        for sheet_name in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet_name, dtype=str, keep_default_na=False)
-            sheet_text_content = []
-            for col in df.columns:
-                col_text = df[col].astype(str).str.strip().replace('', pd.NA).dropna().str.cat(sep=' ')
-                if col_text:
-                    sheet_text_content.append(col_text)
-            if sheet_text_content:
-                all_sheets_text.append(f"Sheet: {sheet_name}\n" + "\n".join(sheet_text_content))
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            all_sheets_text = []
+            for ws in wb.worksheets:
+                rows = ws.iter_rows(values_only=True)
+                next(rows, None) # The first row holds the column headers
+                columns: List[List[str]] = []
+                for row in rows:
+                    if len(row) > len(columns):
+                        columns.extend([] for _ in range(len(row) - len(columns)))
+                    for cells, value in zip(columns, row):
+                        if value is not None:
+                            cell_text = str(value).strip()
+                            if cell_text:
+                                cells.append(cell_text)
+                sheet_text_content = [" ".join(cells) for cells in columns if cells]
+                if sheet_text_content:
+                    all_sheets_text.append(f"Sheet: {ws.title}\n" + "\n".join(sheet_text_content))
+        finally:
+            wb.close()
 
         full_text = "\n\n".join(all_sheets_text)
         return full_text, count_words(full_text)
@@ -86,6 +233,15 @@ def extract_text_from_excel(file_path: str) -> tuple[Optional[str], int]:
         logger.error(f"Error extracting text from Excel {file_path}: {e}")
         return None, 0
 
+# Extractor for each supported file extension
+_EXTRACTORS = {
+    ".pdf": extract_text_from_pdf,
+    ".docx": extract_text_from_docx,
+    ".txt": extract_text_from_txt,
+    ".csv": extract_text_from_csv,
+    ".xlsx": extract_text_from_excel,
+}
+
 def extract_text_from_file(file_path_str: str, file_extension: str, mime_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Main function to extract text from a file based on its extension or mime type.
@@ -101,19 +257,11 @@ def extract_text_from_file(file_path_str: str, file_extension: str, mime_type: O
 
     logger.info(f"Attempting to extract text from {file_path_str} with extension {file_extension}")
 
-    if file_extension == ".pdf":
-        extracted_text, word_c = extract_text_from_pdf(file_path_str)
-    elif file_extension == ".docx":
-        extracted_text, word_c = extract_text_from_docx(file_path_str)
-    elif file_extension == ".txt":
-        extracted_text, word_c = extract_text_from_txt(file_path_str)
-    elif file_extension == ".csv":
-        extracted_text, word_c = extract_text_from_csv(file_path_str)
-    elif file_extension == ".xlsx":
-        extracted_text, word_c = extract_text_from_excel(file_path_str)
-    else:
+    extractor = _EXTRACTORS.get(file_extension)
+    if extractor is None:
         logger.warning(f"Unsupported file extension for text extraction: {file_extension} for file {file_path_str}")
         return None
+    extracted_text, word_c = extractor(file_path_str)
 
     if extracted_text is not None:
         logger.info(f"Successfully extracted {word_c} words from {file_path_str}.")
@@ -203,26 +351,56 @@ BUSINESS_KEYWORDS = [
     "customer behavior",
     "growth strategy"
 ]
+# Results are tracked as a bitmask with one bit per keyword, in BUSINESS_KEYWORDS order
+_KEYWORD_BITS = {keyword: 1 << index for index, keyword in enumerate(BUSINESS_KEYWORDS)}
+_ALL_KEYWORDS_MASK = (1 << len(BUSINESS_KEYWORDS)) - 1
+# Lowercased once here rather than on every call; pairs each keyword's bit with its search form
+_KEYWORD_SEARCH_TERMS = tuple((_KEYWORD_BITS[keyword], keyword.lower()) for keyword in BUSINESS_KEYWORDS)
+# Text is lowercased and scanned one window of this many characters at a time; windows
+# overlap by enough characters that a keyword spanning two of them is still found
+KEYWORD_SCAN_BLOCK_CHARS = 1024 * 1024
+_KEYWORD_SCAN_OVERLAP = max(len(search_term) for _, search_term in _KEYWORD_SEARCH_TERMS) - 1
+# Result masks for recently analyzed texts, keyed by a digest of the text so re-uploads
+# and retries skip the scan without the cache holding on to the text itself. Callers
+# run this from worker threads, hence the lock.
+_keyword_results_cache: LRUCache = LRUCache(maxsize=1024)
+_keyword_results_lock = threading.Lock()
+
+def _keyword_results(mask: int) -> Dict[str, bool]:
+    return {keyword: bool(mask & bit) for keyword, bit in _KEYWORD_BITS.items()}
 
 def analyze_text_keywords(text_content: str) -> Dict[str, bool]:
     """
     Analyzes the text content for the presence of predefined business keywords.
     Performs a case-insensitive search.
     """
-    analysis_results = {}
     if not text_content:
-        for keyword in BUSINESS_KEYWORDS:
-            analysis_results[keyword] = False
-        return analysis_results
-
-    lower_text_content = text_content.lower()
-    for keyword in BUSINESS_KEYWORDS:
-        analysis_results[keyword] = keyword.lower() in lower_text_content
-
-    logger.info(f"Keyword analysis complete. Results: {analysis_results}")
+        return _keyword_results(0)
+
+    digest = hashlib.blake2b(text_content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _keyword_results_lock:
+        cached = _keyword_results_cache.get(digest)
+    if cached is not None:
+        return _keyword_results(cached)
+
+    # A handful of fixed phrases: each `in` is a single C-level substring scan, which
+    # beats a combined regex pass at this size. Lowercasing window by window keeps the
+    # extra copy to one block, and the scan stops once every keyword has been found.
+    mask = 0
+    for start in range(0, len(text_content), KEYWORD_SCAN_BLOCK_CHARS):
+        window = text_content[start:start + KEYWORD_SCAN_BLOCK_CHARS + _KEYWORD_SCAN_OVERLAP].lower()
+        for bit, search_term in _KEYWORD_SEARCH_TERMS:
+            if not mask & bit and search_term in window:
+                mask |= bit
+        if mask == _ALL_KEYWORDS_MASK:
+            break
+
+    with _keyword_results_lock:
+        _keyword_results_cache[digest] = mask
+    analysis_results = _keyword_results(mask)
+    logger.info("Keyword analysis complete. Results: %s", analysis_results)
     return analysis_results
 
-
 if __name__ == '__main__':
     # ... (rest of the existing if __name__ == '__main__' block) ...
     # Add tests for keyword analysis
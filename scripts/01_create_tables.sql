@@ -90,6 +90,29 @@ CREATE TABLE IF NOT EXISTS documents (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Market analyses stored by POST /api/analyze
+CREATE TABLE IF NOT EXISTS market_analyses (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    query TEXT NOT NULL,
+    market_domain VARCHAR(255),
+    question TEXT,
+    insights JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Uploaded files and their processed summaries, listed by /api/files
+CREATE TABLE IF NOT EXISTS uploaded_files (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    filename VARCHAR(255) NOT NULL,
+    file_type VARCHAR(100),
+    file_size BIGINT, -- Size in bytes
+    processing_status VARCHAR(50) DEFAULT 'pending',
+    processed_data JSONB,
+    uploaded_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_data_sources_user_id ON data_sources(user_id);
 CREATE INDEX IF NOT EXISTS idx_reports_user_id ON reports(user_id);
@@ -99,3 +122,5 @@ CREATE INDEX IF NOT EXISTS idx_competitors_user_id ON competitors(user_id);
 CREATE INDEX IF NOT EXISTS idx_documents_user_id ON documents(user_id);
 CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status);
 CREATE INDEX IF NOT EXISTS idx_documents_upload_time ON documents(upload_time);
+CREATE INDEX IF NOT EXISTS idx_market_analyses_user_id ON market_analyses(user_id);
+CREATE INDEX IF NOT EXISTS idx_uploaded_files_user_id ON uploaded_files(user_id);
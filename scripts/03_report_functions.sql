@@ -0,0 +1,30 @@
+-- Market Intelligence Dashboard RPC functions
+-- Requires the tables from 01_create_tables.sql; SQL function bodies are checked when created
+
+-- Latest analyses and uploaded files for one user, plus their total counts, fetched
+-- in a single round-trip by POST /api/reports/generate
+CREATE OR REPLACE FUNCTION get_report_bundle(uid UUID, lim INT)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'analysis_count', (SELECT count(*) FROM market_analyses WHERE user_id = uid),
+        'file_count', (SELECT count(*) FROM uploaded_files WHERE user_id = uid),
+        'analyses', COALESCE((
+            SELECT json_agg(m)
+            FROM (
+                SELECT * FROM market_analyses
+                WHERE user_id = uid
+                ORDER BY created_at DESC
+                LIMIT lim
+            ) m
+        ), '[]'::json),
+        'files', COALESCE((
+            SELECT json_agg(f)
+            FROM (
+                SELECT filename, file_type, uploaded_at FROM uploaded_files
+                WHERE user_id = uid
+                ORDER BY uploaded_at DESC
+                LIMIT lim
+            ) f
+        ), '[]'::json)
+    );
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,10 @@
+-- Market Intelligence Dashboard composite indexes for per-user queries
+-- CONCURRENTLY avoids locking live tables; run these outside a transaction block
+-- Every table indexed here is created by 01_create_tables.sql, which must run first
+
+-- Data source endpoints filter on id and user_id together
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_data_sources_user_id_id ON data_sources(user_id, id);
+
+-- get_report_bundle reads each user's newest analyses and files
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_market_analyses_user_id_created_at ON market_analyses(user_id, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_uploaded_files_user_id_uploaded_at ON uploaded_files(user_id, uploaded_at DESC);
@@ -27,6 +27,8 @@ if command -v psql &> /dev/null; then
     # Run SQL scripts if PostgreSQL is available
     # psql $DATABASE_URL -f scripts/01_create_tables.sql
     # psql $DATABASE_URL -f scripts/02_seed_data.sql
+    # psql $DATABASE_URL -f scripts/03_report_functions.sql
+    # psql $DATABASE_URL -f scripts/04_query_indexes.sql
 fi
 
 # Test API connections